@@ -3,6 +3,7 @@
 import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import re
 
@@ -10,7 +11,7 @@ import re
 from config import (
     KNOWN_CAR_BRANDS_FOR_CATEGORIES, COCHES_CATEGORY_NAME, UNIVERSAL_CATEGORY_NAME,
     PART_NUMBER_COLUMN_SOURCE, BRAND_COLUMN_SOURCE, APPLICATION_COLUMN_SOURCE,
-    PRICE_COLUMN_SOURCE, QTY_COLUMN_SOURCE, FIXED_WEIGHT_VALUE
+    PRICE_COLUMN_SOURCE, QTY_COLUMN_SOURCE, FIXED_WEIGHT_VALUE, MAX_CONCURRENT_WORKERS
 )
 
 # Import monitoring system
@@ -22,6 +23,11 @@ class BigCommerceUploaderAgent:
         self.base_v3_url = f"https://api.bigcommerce.com/stores/{self.store_hash}/v3"
         self.standard_headers = {"X-Auth-Token":self.access_token,"Accept":"application/json","Content-Type":"application/json"}
         
+        # One keep-alive connection pool shared by all worker threads, so concurrent
+        # products reuse TCP/TLS connections to the API instead of reconnecting per call
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max(MAX_CONCURRENT_WORKERS, 10)))
+        
         # Initialize monitoring
         self.logger = get_bigcommerce_logger()
         
@@ -92,8 +98,8 @@ class BigCommerceUploaderAgent:
         current_headers=self.standard_headers.copy()
         if files: current_headers.pop("Content-Type",None)
         try:
-            if files: response_obj=requests.request(method,url,headers=current_headers,files=files,data=payload,params=params,timeout=60)
-            else: response_obj=requests.request(method,url,headers=current_headers,json=payload,params=params,timeout=30)
+            if files: response_obj=self.session.request(method,url,headers=current_headers,files=files,data=payload,params=params,timeout=60)
+            else: response_obj=self.session.request(method,url,headers=current_headers,json=payload,params=params,timeout=30)
             try: response_json=response_obj.json()
             except json.JSONDecodeError: response_json={"raw_text":response_obj.text,"_error_message":"Response not valid JSON."}
             response_obj.raise_for_status()
@@ -275,7 +281,7 @@ class BigCommerceUploaderAgent:
             with open(image_file_path,'rb') as f_img:
                 files_payload = {'image_file': (os.path.basename(image_file_path), f_img)}
                 url = f"{self.base_v3_url}{endpoint}"
-                response_obj = requests.post(url, headers=file_upload_headers, data=form_data_payload, files=files_payload, timeout=60)
+                response_obj = self.session.post(url, headers=file_upload_headers, data=form_data_payload, files=files_payload, timeout=60)
                 
                 response_json = {}
                 try: response_json = response_obj.json()
@@ -27,6 +27,24 @@ from monitoring import OperationTimer, get_vehicle_logger, LogContext
 # Import settings
 from config import PART_NUMBER_COLUMN_SOURCE, BRAND_COLUMN_SOURCE
 
+# Single-pass tokenizer for concatenated "YEAR MAKE MODEL ..." text. Each year token
+# opens a new application; parenthetical notes and stray parentheses are dropped.
+# findall yields one (year, word) pair per token, with both empty for skipped
+# tokens, so tokenizing needs no per-token Python callbacks.
+_YEAR_TOKEN = r'\d{4}(?:\s*[-–—]\s*\d{4})?(?=\s+[A-Z])'
+_VEHICLE_TOKEN_PATTERN = re.compile(
+    rf'({_YEAR_TOKEN})|\([^)]*\)|((?:(?!{_YEAR_TOKEN})[^\s()])+)|\s+|[()]'
+)
+_YEAR_PATTERN = re.compile(r'\d{4}')
+_ENGINE_PATTERN = re.compile(r'(\d+\.?\d*L(?:\s*V\d+)?|\d+\.?\d*\s*Turbo)', re.I)
+
+# Fast path for the common well-formed shape: "YYYY(-YYYY) Make Model" repeated, with
+# nothing else in the text. Tokens are restricted so the result matches the scanner.
+_FAST_YEAR = r'\d{4}(?:-\d{4})?\s+[A-Z]'
+_FAST_VEHICLE = rf'(\d{{4}})(?:-(\d{{4}}))?\s+([A-Z][A-Za-z&-]*)\s+((?:(?!{_FAST_YEAR})[\w-])+)(?=\s*(?:{_FAST_YEAR}|$))'
+_FAST_SHAPE = re.compile(rf'(?:{_FAST_VEHICLE}\s*)+')
+_FAST_EXTRACT = re.compile(_FAST_VEHICLE)
+
 @dataclass
 class ParseResult:
     """Result from parsing attempt"""
@@ -267,7 +285,7 @@ class EnhancedVehicleApplicationAgent:
                     text_content = element.get_text(strip=True)
                     if len(text_content) > 20:  # Must have substantial content
                         # Use enhanced concatenated text parsing
-                        parsed_apps = self._parse_concatenated_vehicle_text(text_content, vendor_config)
+                        parsed_apps = self._parse_concatenated_vehicle_text(text_content)
                         applications.extend(parsed_apps)
             
             # Remove duplicates
@@ -326,7 +344,7 @@ class EnhancedVehicleApplicationAgent:
                     
                     # Try concatenated format for multiple vehicles
                     elif len(text_content) > 50:
-                        parsed_apps = self._parse_concatenated_vehicle_text(text_content, vendor_config)
+                        parsed_apps = self._parse_concatenated_vehicle_text(text_content)
                         applications.extend(parsed_apps)
             
             # Remove duplicates
@@ -649,36 +667,64 @@ class EnhancedVehicleApplicationAgent:
                 strategy_used='fallback_heuristic', errors=[str(e)], metadata={}
             )
     
-    def _parse_concatenated_vehicle_text(self, text: str, vendor_config: Optional[VendorConfig]) -> List[VehicleApplication]:
-        """Enhanced concatenated text parsing using vendor-specific patterns"""
+    def _parse_concatenated_vehicle_text(self, text: str) -> List[VehicleApplication]:
+        """Concatenated text parsing with a single tokenization pass (works for all vendors)"""
         applications = []
         
         try:
-            # Use vendor-specific patterns if available
-            if vendor_config:
-                vehicle_patterns = brand_registry.get_vehicle_patterns(vendor_config.brand_names[0].upper().replace(' ', '_'))
-                if 'concatenated' in vehicle_patterns:
-                    pattern = vehicle_patterns['concatenated']
-                    potential_vehicles = pattern.findall(text)
-                else:
-                    # Fallback to generic pattern
-                    potential_vehicles = re.findall(r'(\d{4}(?:-\d{4})?\s+[A-Z][a-zA-Z\s]+?(?=\d{4}|$))', text)
-            else:
-                # Generic concatenated pattern
-                potential_vehicles = re.findall(r'(\d{4}(?:-\d{4})?\s+[A-Z][a-zA-Z\s]+?(?=\d{4}|$))', text)
+            text = text.strip()
+            if _FAST_SHAPE.fullmatch(text):
+                return [
+                    VehicleApplication(
+                        year_start=int(start),
+                        year_end=int(end or start),
+                        make=make,
+                        model=model
+                    )
+                    for start, end, make, model in _FAST_EXTRACT.findall(text)
+                ]
             
-            for vehicle_text in potential_vehicles:
-                vehicle_text = vehicle_text.strip()
-                if len(vehicle_text) > 8:  # Must have at least year + make
-                    app = self._parse_single_vehicle_text(vehicle_text)
-                    if app:
-                        applications.append(app)
+            # Group words under the year token that precedes them
+            vehicles = []
+            words = None
+            for year_token, word in _VEHICLE_TOKEN_PATTERN.findall(text):
+                if year_token:
+                    words = []
+                    vehicles.append((year_token, words))
+                elif word and words is not None:
+                    words.append(word)
+            
+            for year_token, words in vehicles:
+                app = self._build_application_from_tokens(year_token, words)
+                if app:
+                    applications.append(app)
                         
         except Exception as e:
             self.logger.error(f"Error parsing concatenated text: {e}")
         
         return applications
     
+    def _build_application_from_tokens(self, year_token: str, words: List[str]) -> Optional[VehicleApplication]:
+        """Build a vehicle application from a year token and the words that follow it"""
+        # Must have at least make + model
+        if len(words) < 2:
+            return None
+        
+        years = _YEAR_PATTERN.findall(year_token)
+        year_start = int(years[0])
+        year_end = int(years[1]) if len(years) > 1 else year_start
+        
+        engine_match = _ENGINE_PATTERN.search(' '.join(words[2:]))
+        
+        return VehicleApplication(
+            year_start=year_start,
+            year_end=year_end,
+            make=words[0],
+            model=words[1],
+            trim=' '.join(words[2:]) if len(words) > 2 else None,
+            engine=engine_match.group(1).strip() if engine_match else None
+        )
+    
     def _parse_single_vehicle_text(self, text: str) -> Optional[VehicleApplication]:
         """Parse a single vehicle application from text"""
         try:
@@ -2,12 +2,17 @@
 
 import os
 import io
+import functools
+import hashlib
+import threading
 import json
 import requests
 import time
 import re
+import numpy as np
 from PIL import Image, ImageOps
 from urllib.parse import urljoin, unquote, urlparse
+from collections import OrderedDict
 from bs4 import BeautifulSoup
 from serpapi import GoogleSearch 
 
@@ -21,6 +26,29 @@ from config import (
 # Import monitoring system
 from monitoring import OperationTimer, get_image_logger, LogContext
 
+# Characters dropped when normalizing part numbers for comparison
+_PART_NUMBER_STRIP_RE = re.compile(r'[^\w\-]')
+
+# Characters dropped from a brand name when guessing its official domain
+_BRAND_CLEAN_RE = re.compile(r'[^a-z0-9]')
+
+# URL fragments that mark placeholder/stock images; the lookahead finds overlapping hits
+_GENERIC_URL_PATTERNS = (
+    'placeholder', 'default', 'noimage', 'coming-soon',
+    'stock', 'generic', 'sample', 'demo', 'thumbnail'
+)
+_GENERIC_URL_RE = re.compile('(?=(' + '|'.join(map(re.escape, _GENERIC_URL_PATTERNS)) + '))')
+# The unambiguous subset: a URL naming one of these is rejected before its bytes are decoded
+_PLACEHOLDER_URL_RE = re.compile('placeholder|noimage|coming-soon', re.IGNORECASE)
+
+# Decoded images kept per agent; small because a full-size photo decodes to tens of MB
+_DECODE_CACHE_SIZE = 8
+
+@functools.lru_cache(maxsize=512)
+def _normalize_brand(brand):
+    """Registry key for a brand name; memoized since batches repeat a handful of brands"""
+    return brand.upper().strip()
+
 class ImageSourcingAgent:
     def __init__(self, serpapi_key):
         self.serpapi_key = serpapi_key
@@ -33,13 +61,29 @@ class ImageSourcingAgent:
         
         # Initialize brand registry with official domains and patterns
         self.brand_registry = self._initialize_brand_registry()
-        
+
+        # Lower-cased official domains per registry brand, matched against every candidate URL
+        self._brand_domains = {
+            brand: tuple(domain.lower() for domain in info['domains'])
+            for brand, info in self.brand_registry.items()
+        }
+
+        # Authority is a pure function of (url, brand) once the registry is built;
+        # the per-instance cache also serves _is_official_brand_site
+        self._get_domain_authority = functools.lru_cache(maxsize=4096)(self._get_domain_authority)
+
         # Part number cleaning patterns
         self.part_number_patterns = [
             r'[A-Z0-9\-]{3,}',  # Basic alphanumeric with dashes
             r'\b[A-Z]{1,3}[\-\s]*\d+[A-Z0-9\-]*\b',  # Brand prefix + numbers
             r'\b\d+[A-Z]+[\-\d]*\b'  # Numbers + letters pattern
         ]
+        # Compiled once; part number extraction runs over every scraped page
+        self._part_regexes = [re.compile(pattern) for pattern in self.part_number_patterns]
+
+        # Decoded images keyed by content digest, shared by the validation and processing steps
+        self._decode_cache = OrderedDict()
+        self._decode_cache_lock = threading.Lock()
 
     def _initialize_brand_registry(self):
         """Initialize comprehensive brand registry with official domains and authority scores"""
@@ -144,24 +188,46 @@ class ImageSourcingAgent:
             }
         }
 
+    def _decode_image(self, image_bytes):
+        """Fully decoded PIL image for image_bytes, reused while its content stays in the LRU cache"""
+        digest = hashlib.blake2b(image_bytes, digest_size=16).digest()
+        with self._decode_cache_lock:
+            img = self._decode_cache.get(digest)
+            if img is not None:
+                self._decode_cache.move_to_end(digest)
+                return img
+        
+        img = Image.open(io.BytesIO(image_bytes))
+        img.load()  # Decode now so threads only ever share a finished image
+        with self._decode_cache_lock:
+            self._decode_cache[digest] = img
+            if len(self._decode_cache) > _DECODE_CACHE_SIZE:
+                self._decode_cache.popitem(last=False)
+        return img
+
     def _is_white_background(self, image_bytes):
         try:
-            img = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+            img = self._decode_image(image_bytes).convert('RGB')
             width, height = img.size
             if width < 10 or height < 10: return False
             border_w = min(int(width * BG_BORDER_PERCENTAGE), width // 4)
             border_h = min(int(height * BG_BORDER_PERCENTAGE), height // 4)
             
-            border_pixels = []
-            border_pixels.extend(img.crop((0, 0, width, border_h)).getdata())
-            border_pixels.extend(img.crop((0, height - border_h, width, height)).getdata())
-            border_pixels.extend(img.crop((0, border_h, border_w, height - border_h)).getdata())
-            border_pixels.extend(img.crop((width - border_w, border_h, width, height - border_h)).getdata())
-
-            if not border_pixels: return False
+            # Top, bottom, left and right border bands as array views (no per-pixel Python loop)
+            pixels = np.asarray(img)
+            border_bands = (
+                pixels[:border_h],
+                pixels[height - border_h:],
+                pixels[border_h:height - border_h, :border_w],
+                pixels[border_h:height - border_h, width - border_w:]
+            )
+            border_pixel_count = sum(band.shape[0] * band.shape[1] for band in border_bands)
+            if not border_pixel_count: return False
             
-            white_pixel_count = sum(1 for r,g,b in border_pixels if r >= BG_COLOR_THRESHOLD and g >= BG_COLOR_THRESHOLD and b >= BG_COLOR_THRESHOLD)
-            return (white_pixel_count / len(border_pixels)) >= BG_WHITE_PIXEL_PERCENTAGE
+            white_pixel_count = sum(
+                np.count_nonzero((band >= BG_COLOR_THRESHOLD).all(axis=-1)) for band in border_bands
+            )
+            return (white_pixel_count / border_pixel_count) >= BG_WHITE_PIXEL_PERCENTAGE
         except Exception:
             return False
 
@@ -174,7 +240,7 @@ class ImageSourcingAgent:
 
     def _process_image_maintaining_aspect_ratio(self, image_bytes):
         try:
-            img = Image.open(io.BytesIO(image_bytes))
+            img = self._decode_image(image_bytes)
             if img is None:
                 return None
                 
@@ -265,17 +331,23 @@ class ImageSourcingAgent:
         }
         
         try:
-            # 1. Basic dimension and format validation
+            # Cheapest checks first, so rejected candidates never get a full decode
+            # 0. Placeholder URL
+            if _PLACEHOLDER_URL_RE.search(image_url or ''):
+                validation_result['rejection_reason'] = 'Placeholder URL'
+                return validation_result
+            
+            # 1. Basic dimension and format validation (header only)
             if not self._check_original_image_dimensions(image_bytes):
                 validation_result['rejection_reason'] = 'Image too small'
                 return validation_result
             
-            # 2. Background validation
+            # 2. Background validation (first full decode)
             if not self._is_white_background(image_bytes):
                 validation_result['rejection_reason'] = 'Non-white background'
                 return validation_result
             
-            img = Image.open(io.BytesIO(image_bytes))
+            img = self._decode_image(image_bytes)
             validation_result['validation_details']['dimensions'] = f"{img.width}x{img.height}"
             
             quality_factors = []
@@ -324,14 +396,18 @@ class ImageSourcingAgent:
             validation_result['rejection_reason'] = f'Validation error: {e}'
             return validation_result
     
+    @staticmethod
+    def _image_size(image):
+        """(width, height) of a PIL image, or of encoded bytes read from the header alone"""
+        if isinstance(image, (bytes, bytearray)):
+            image = Image.open(io.BytesIO(image))  # lazy: no pixel data is decoded
+        return image.size
+    
     def _assess_image_quality(self, img):
-        """Assess overall image quality using various metrics"""
+        """Assess overall image quality using various metrics (img may be a PIL image or encoded bytes)"""
         try:
-            # Convert to grayscale for analysis
-            gray = img.convert('L')
-            
-            # Simple quality metrics without numpy dependency
-            width, height = img.size
+            # Simple quality metrics from the dimensions alone (no pixel pass needed)
+            width, height = self._image_size(img)
             
             # 1. Resolution score (higher resolution = better quality)
             resolution_score = min((width * height) / 1000000.0, 1.0)  # Normalize to 1MP
@@ -351,6 +427,24 @@ class ImageSourcingAgent:
         except Exception:
             return 0.5  # Default moderate quality if assessment fails
     
+    def _assess_image_quality_batch(self, imgs):
+        """Assess quality for several images in one vectorized pass (same scores as _assess_image_quality)"""
+        if not imgs:
+            return []
+        
+        sizes = np.array([self._image_size(img) for img in imgs], dtype=np.float64)
+        width, height = sizes[:, 0], sizes[:, 1]
+        
+        resolution_score = np.minimum(width * height / 1000000.0, 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            aspect_ratio = width / height
+        aspect_score = np.where((aspect_ratio >= 0.5) & (aspect_ratio <= 2.0), 1.0, 0.5)
+        size_score = np.where((width >= 400) & (height >= 400), 1.0, 0.7)
+        
+        quality_scores = np.minimum(resolution_score * 0.4 + aspect_score * 0.3 + size_score * 0.3, 1.0)
+        quality_scores[height == 0] = 0.5  # Same fallback as the per-image assessment
+        return quality_scores.tolist()
+    
     def _detect_brand_presence(self, img, brand):
         """Detect brand presence in image (simplified text detection)"""
         try:
@@ -409,16 +503,9 @@ class ImageSourcingAgent:
         try:
             generic_indicators = 0
             
-            # Check URL for generic image indicators
+            # Check URL for generic image indicators (each distinct one counts once)
             url_lower = image_url.lower()
-            generic_url_patterns = [
-                'placeholder', 'default', 'noimage', 'coming-soon',
-                'stock', 'generic', 'sample', 'demo', 'thumbnail'
-            ]
-            
-            for pattern in generic_url_patterns:
-                if pattern in url_lower:
-                    generic_indicators += 0.4
+            generic_indicators += 0.4 * len(set(_GENERIC_URL_RE.findall(url_lower)))
             
             # Check image dimensions for common stock image sizes
             width, height = img.size
@@ -556,6 +643,11 @@ class ImageSourcingAgent:
             print(f"    SerpApi Err for '{query}': {e}")
             return []
 
+    def _lookup_brand(self, brand):
+        """Return (normalized brand, registry entry or None) for a brand name"""
+        brand_upper = _normalize_brand(brand)
+        return brand_upper, self.brand_registry.get(brand_upper)
+
     def _get_domain_authority(self, url, brand):
         """Get domain authority score for a URL based on brand registry"""
         if not brand or not url:
@@ -565,15 +657,14 @@ class ImageSourcingAgent:
         domain = parsed_url.netloc.replace('www.', '')
         
         # Check exact brand match in registry
-        brand_upper = brand.upper().strip()
-        if brand_upper in self.brand_registry:
-            brand_info = self.brand_registry[brand_upper]
-            for official_domain in brand_info['domains']:
-                if domain in official_domain.lower() or official_domain.lower() in domain:
+        brand_upper, brand_info = self._lookup_brand(brand)
+        if brand_info:
+            for official_domain in self._brand_domains[brand_upper]:
+                if domain in official_domain or official_domain in domain:
                     return brand_info['authority']
         
         # Check for common official domain patterns
-        brand_clean = re.sub(r'[^a-z0-9]', '', brand.lower())
+        brand_clean = _BRAND_CLEAN_RE.sub('', brand.lower())
         official_indicators = [
             f'{brand_clean}.com',
             f'{brand_clean}parts.com', 
@@ -599,28 +690,27 @@ class ImageSourcingAgent:
         found_numbers = []
         text_upper = text.upper()
         
-        for pattern in self.part_number_patterns:
-            matches = re.findall(pattern, text_upper)
-            found_numbers.extend(matches)
+        for part_regex in self._part_regexes:
+            found_numbers.extend(part_regex.findall(text_upper))
             
-        # Clean and deduplicate
-        cleaned = []
+        # Clean and deduplicate (dict keeps first-seen order)
+        cleaned = {}
         for num in found_numbers:
-            cleaned_num = re.sub(r'[^\w\-]', '', num).strip()
-            if len(cleaned_num) >= 3 and cleaned_num not in cleaned:
-                cleaned.append(cleaned_num)
+            cleaned_num = _PART_NUMBER_STRIP_RE.sub('', num).strip()
+            if len(cleaned_num) >= 3:
+                cleaned[cleaned_num] = None
                 
-        return cleaned
+        return list(cleaned)
 
     def _validate_part_number_match(self, found_numbers, target_part_number):
         """Validate if any found part numbers match the target part number"""
         if not found_numbers or not target_part_number:
             return False
             
-        target_clean = re.sub(r'[^\w\-]', '', target_part_number.upper()).strip()
+        target_clean = _PART_NUMBER_STRIP_RE.sub('', target_part_number.upper()).strip()
         
         for found in found_numbers:
-            found_clean = re.sub(r'[^\w\-]', '', found.upper()).strip()
+            found_clean = _PART_NUMBER_STRIP_RE.sub('', found.upper()).strip()
             
             # Exact match
             if found_clean == target_clean:
@@ -650,12 +740,11 @@ class ImageSourcingAgent:
                 if brand and len(all_found_paths) < max_images_per_product:
                     self.logger.info(f"PHASE 1: Searching official {brand} websites")
             
-            brand_upper = brand.upper().strip()
+            _, brand_info = self._lookup_brand(brand)
             official_queries = []
             
             # Use brand registry for targeted official searches
-            if brand_upper in self.brand_registry:
-                brand_info = self.brand_registry[brand_upper]
+            if brand_info:
                 for pattern in brand_info['search_patterns']:
                     official_queries.append(f'{pattern} "{part_num}"')
                     official_queries.append(f'{pattern} {part_num} product')
@@ -722,9 +811,8 @@ class ImageSourcingAgent:
             print(f"    PHASE 3: Targeted image search (official sources only)...")
             
             # Only search for images from official domains
-            brand_upper = brand.upper().strip()
-            if brand_upper in self.brand_registry:
-                brand_info = self.brand_registry[brand_upper]
+            _, brand_info = self._lookup_brand(brand)
+            if brand_info:
                 official_domains = " OR ".join([f"site:{domain}" for domain in brand_info['domains']])
                 
                 image_queries = [
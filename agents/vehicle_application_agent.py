@@ -2,12 +2,14 @@
 
 import os
 import re
+import sys
 import json
 import time
 import requests
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 from typing import List, Dict, Optional, Any
+from dataclasses import dataclass
 
 # Import settings from the central config file
 from config import PART_NUMBER_COLUMN_SOURCE, BRAND_COLUMN_SOURCE
@@ -15,19 +17,72 @@ from config import PART_NUMBER_COLUMN_SOURCE, BRAND_COLUMN_SOURCE
 # Import monitoring system
 from monitoring import OperationTimer, get_vehicle_logger, LogContext
 
+# Standardization mappings for vehicle makes (values are canonical, shared strings)
+_MAKE_MAPPINGS = {
+    'HONDA': 'Honda',
+    'ACURA': 'Acura', 
+    'TOYOTA': 'Toyota',
+    'LEXUS': 'Lexus',
+    'NISSAN': 'Nissan',
+    'INFINITI': 'Infiniti',
+    'FORD': 'Ford',
+    'LINCOLN': 'Lincoln',
+    'CHEVROLET': 'Chevrolet',
+    'CHEVY': 'Chevrolet',
+    'GMC': 'GMC',
+    'CADILLAC': 'Cadillac',
+    'DODGE': 'Dodge',
+    'CHRYSLER': 'Chrysler',
+    'JEEP': 'Jeep',
+    'RAM': 'Ram',
+    'BMW': 'BMW',
+    'MERCEDES': 'Mercedes-Benz',
+    'MERCEDES-BENZ': 'Mercedes-Benz',
+    'AUDI': 'Audi',
+    'VOLKSWAGEN': 'Volkswagen',
+    'VW': 'Volkswagen',
+    'VOLVO': 'Volvo',
+    'SUBARU': 'Subaru',
+    'MAZDA': 'Mazda',
+    'MITSUBISHI': 'Mitsubishi',
+    'HYUNDAI': 'Hyundai',
+    'KIA': 'Kia',
+    'SUZUKI': 'Suzuki'
+}
+
+# Vehicle text patterns, compiled once at import instead of per parsed string
+_ENGINE_FORMAT_RE = re.compile(r'(\d+\.?\d*)\s*[LlCc]+|\b(V\d+|I\d+|H\d+)\b')
+_HAWK_SECTION_TEXT_RE = re.compile(r'this part is for|see all vehicles|vehicle applications', re.I)
+_HAWK_VEHICLE_TEXT_RE = re.compile(r'\d{4}.*(?:Honda|Toyota|Ford|Chevrolet|BMW|Mercedes)', re.I)
+# Zero-width split point before each "year[-year] Make" so one split() separates the vehicles
+_VEHICLE_SPLIT_RE = re.compile(r'(?=\d{4}(?:-\d{4})?\s+[A-Z])')
+_OE_SUFFIX_RE = re.compile(r'\s*(OE\s+Incl\..*?(?=\d{4}|$))')
+_PARENTHETICAL_RE = re.compile(r'\s*\(.*?\)')
+_LEADING_YEARS_RE = re.compile(r'(\d{4})(?:-(\d{4}))?\s+')
+_YEARS_RE = re.compile(r'(\d{4})(?:-(\d{4}))?')
+_SINGLE_VEHICLE_ENGINE_RE = re.compile(r'(\d+\.?\d*L(?:\s*V\d+)?|\d+\.?\d*\s*Turbo)', re.I)
+_HAWK_ENGINE_RE = re.compile(r'(\d+\.?\d*L?\s*(?:V\d+|I\d+|Turbo|DOHC|SOHC|Hybrid)?)(?:\s|$)', re.I)
+_YEAR_MAKE_MODEL_RE = re.compile(r'(\d{4})\s+([A-Z][a-zA-Z]+)\s+([A-Za-z0-9\-]+)')
+
+@dataclass(slots=True, eq=False)
 class VehicleApplication:
-    """Standardized vehicle application data structure"""
-    def __init__(self, year_start: int = None, year_end: int = None, make: str = None, 
-                 model: str = None, trim: str = None, engine: str = None, 
-                 position: str = None, notes: str = None):
-        self.year_start = year_start
-        self.year_end = year_end
-        self.make = self._normalize_make(make) if make else None
-        self.model = model.strip() if model else None
-        self.trim = trim.strip() if trim else None
-        self.engine = self._normalize_engine(engine) if engine else None
-        self.position = position.strip() if position else None
-        self.notes = notes.strip() if notes else None
+    """Standardized vehicle application data structure (slotted to keep large batches compact)"""
+    year_start: Optional[int] = None
+    year_end: Optional[int] = None
+    make: Optional[str] = None
+    model: Optional[str] = None
+    trim: Optional[str] = None
+    engine: Optional[str] = None
+    position: Optional[str] = None
+    notes: Optional[str] = None
+    
+    def __post_init__(self):
+        self.make = self._normalize_make(self.make) if self.make else None
+        self.model = sys.intern(self.model.strip()) if self.model else None
+        self.trim = self.trim.strip() if self.trim else None
+        self.engine = self._normalize_engine(self.engine) if self.engine else None
+        self.position = self.position.strip() if self.position else None
+        self.notes = self.notes.strip() if self.notes else None
     
     def _normalize_make(self, make: str) -> str:
         """Normalize vehicle make names"""
@@ -36,40 +91,7 @@ class VehicleApplication:
         
         make_upper = make.upper().strip()
         
-        # Standardization mappings
-        make_mappings = {
-            'HONDA': 'Honda',
-            'ACURA': 'Acura', 
-            'TOYOTA': 'Toyota',
-            'LEXUS': 'Lexus',
-            'NISSAN': 'Nissan',
-            'INFINITI': 'Infiniti',
-            'FORD': 'Ford',
-            'LINCOLN': 'Lincoln',
-            'CHEVROLET': 'Chevrolet',
-            'CHEVY': 'Chevrolet',
-            'GMC': 'GMC',
-            'CADILLAC': 'Cadillac',
-            'DODGE': 'Dodge',
-            'CHRYSLER': 'Chrysler',
-            'JEEP': 'Jeep',
-            'RAM': 'Ram',
-            'BMW': 'BMW',
-            'MERCEDES': 'Mercedes-Benz',
-            'MERCEDES-BENZ': 'Mercedes-Benz',
-            'AUDI': 'Audi',
-            'VOLKSWAGEN': 'Volkswagen',
-            'VW': 'Volkswagen',
-            'VOLVO': 'Volvo',
-            'SUBARU': 'Subaru',
-            'MAZDA': 'Mazda',
-            'MITSUBISHI': 'Mitsubishi',
-            'HYUNDAI': 'Hyundai',
-            'KIA': 'Kia',
-            'SUZUKI': 'Suzuki'
-        }
-        
-        return make_mappings.get(make_upper, make.title())
+        return _MAKE_MAPPINGS.get(make_upper) or sys.intern(make.title())
     
     def _normalize_engine(self, engine: str) -> str:
         """Normalize engine specifications"""
@@ -79,11 +101,9 @@ class VehicleApplication:
         # Clean and standardize engine format
         engine = engine.strip()
         
-        # Common patterns: "2.0L", "2.0 L", "2000cc", "V6", "2.0L Turbo"
-        engine_pattern = r'(\d+\.?\d*)\s*[LlCc]+|\b(V\d+|I\d+|H\d+)\b'
-        
-        # Keep original if it matches common patterns, otherwise clean it
-        if re.search(engine_pattern, engine):
+        # Keep original if it matches common patterns ("2.0L", "2.0 L", "2000cc",
+        # "V6", "2.0L Turbo"), otherwise clean it
+        if _ENGINE_FORMAT_RE.search(engine):
             return engine
         else:
             return engine.replace('  ', ' ').strip()
@@ -174,7 +194,7 @@ class HawkPerformanceParser(BaseVehicleParser):
             
             # Strategy 2: Look for sections with "this part is for" or similar text
             if not vehicle_sections:
-                text_sections = soup.find_all(text=re.compile(r'this part is for|see all vehicles|vehicle applications', re.I))
+                text_sections = soup.find_all(text=_HAWK_SECTION_TEXT_RE)
                 for text in text_sections:
                     parent = text.parent
                     if parent:
@@ -183,7 +203,7 @@ class HawkPerformanceParser(BaseVehicleParser):
             
             # Strategy 3: Look for any div/section with vehicle-like text
             if not vehicle_sections:
-                vehicle_sections = soup.find_all(['div', 'section'], string=re.compile(r'\d{4}.*(?:Honda|Toyota|Ford|Chevrolet|BMW|Mercedes)', re.I))
+                vehicle_sections = soup.find_all(['div', 'section'], string=_HAWK_VEHICLE_TEXT_RE)
             
             # Parse vehicle lists - FIXED: Handle concatenated vehicle text
             for section in vehicle_sections:
@@ -214,10 +234,7 @@ class HawkPerformanceParser(BaseVehicleParser):
         try:
             # CRITICAL FIX: Split concatenated text into individual vehicle applications
             # Pattern: Year + Make + Model combination (e.g., "2019 Honda Civic", "2020 Acura ILX")
-            vehicle_pattern = r'(\d{4}(?:-\d{4})?\s+[A-Z][a-zA-Z\s]+?(?=\d{4}|$))'
-            
-            # Split text by year patterns to separate individual vehicles
-            potential_vehicles = re.split(r'(?=\d{4}(?:-\d{4})?\s+[A-Z])', text)
+            potential_vehicles = _VEHICLE_SPLIT_RE.split(text)
             
             for vehicle_text in potential_vehicles:
                 vehicle_text = vehicle_text.strip()
@@ -244,12 +261,12 @@ class HawkPerformanceParser(BaseVehicleParser):
         """Parse a single, clean vehicle application text"""
         try:
             # Clean the text - remove common suffixes that cause issues
-            text = re.sub(r'\s*(OE\s+Incl\..*?(?=\d{4}|$))', '', text)
-            text = re.sub(r'\s*\(.*?\)', '', text)  # Remove parenthetical content temporarily
+            text = _OE_SUFFIX_RE.sub('', text)
+            text = _PARENTHETICAL_RE.sub('', text)  # Remove parenthetical content temporarily
             text = text.strip()
             
             # Extract year(s) - single year or range
-            year_match = re.match(r'(\d{4})(?:-(\d{4}))?\s+', text)
+            year_match = _LEADING_YEARS_RE.match(text)
             if not year_match:
                 return None
                 
@@ -271,7 +288,7 @@ class HawkPerformanceParser(BaseVehicleParser):
             trim = " ".join(words[2:]) if len(words) > 2 else None
             
             # Basic engine extraction from original text (before cleaning)
-            engine_match = re.search(r'(\d+\.?\d*L(?:\s*V\d+)?|\d+\.?\d*\s*Turbo)', text, re.I)
+            engine_match = _SINGLE_VEHICLE_ENGINE_RE.search(text)
             engine = engine_match.group(1).strip() if engine_match else None
             
             return VehicleApplication(
@@ -293,8 +310,7 @@ class HawkPerformanceParser(BaseVehicleParser):
         
         try:
             # Find all year+make+model patterns in the text
-            pattern = r'(\d{4})\s+([A-Z][a-zA-Z]+)\s+([A-Za-z0-9\-]+)'
-            matches = re.findall(pattern, text)
+            matches = _YEAR_MAKE_MODEL_RE.findall(text)
             
             seen_combinations = set()
             for year, make, model in matches:
@@ -325,7 +341,7 @@ class HawkPerformanceParser(BaseVehicleParser):
             # Pattern: [Year(s)] [Make] [Model] [Trim] [Engine]
             
             # Extract year(s) - can be single year or range
-            year_match = re.search(r'(\d{4})(?:-(\d{4}))?', text)
+            year_match = _YEARS_RE.search(text)
             year_start = int(year_match.group(1)) if year_match else None
             year_end = int(year_match.group(2)) if year_match and year_match.group(2) else year_start
             
@@ -336,7 +352,7 @@ class HawkPerformanceParser(BaseVehicleParser):
                 remaining_text = text
             
             # Extract engine info (usually in parentheses or at the end)
-            engine_match = re.search(r'(\d+\.?\d*L?\s*(?:V\d+|I\d+|Turbo|DOHC|SOHC|Hybrid)?)(?:\s|$)', remaining_text, re.I)
+            engine_match = _HAWK_ENGINE_RE.search(remaining_text)
             engine = engine_match.group(1).strip() if engine_match else None
             
             # Remove engine from text
@@ -457,7 +473,7 @@ class GenericTableParser(BaseVehicleParser):
             
             for cell in cell_texts:
                 # Check for year patterns
-                year_match = re.search(r'(\d{4})(?:-(\d{4}))?', cell)
+                year_match = _YEARS_RE.search(cell)
                 if year_match and not year_start:
                     year_start = int(year_match.group(1))
                     year_end = int(year_match.group(2)) if year_match.group(2) else year_start
@@ -9,10 +9,16 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from brand_registry import brand_registry
+from section_output import run_sections_concurrently
 from agents.enhanced_vehicle_agent import EnhancedVehicleApplicationAgent
 from agents.vehicle_application_agent import VehicleApplication
 from config import PART_NUMBER_COLUMN_SOURCE, BRAND_COLUMN_SOURCE
 
+def run_demo_sections(sections) -> None:
+    """Run independent demo sections concurrently and print their output in order"""
+    for _, output in run_sections_concurrently(sections):
+        sys.stdout.write(output)
+
 def demo_brand_registry():
     """Demo the unified brand registry capabilities"""
     print("🏭 UNIFIED BRAND REGISTRY DEMONSTRATION")
@@ -109,7 +115,7 @@ def demo_concatenated_text_parsing():
         print(f"   📝 Input: {test_case['text'][:80]}...")
         
         # Parse the concatenated text
-        applications = agent._parse_concatenated_vehicle_text(test_case['text'], None)
+        applications = agent._parse_concatenated_vehicle_text(test_case['text'])
         
         print(f"   ✅ Extracted: {len(applications)} vehicle applications")
         
@@ -185,6 +191,16 @@ def demo_error_resilience():
     
     agent = EnhancedVehicleApplicationAgent()
     
+    # Resolve the parsing strategies once instead of per test input
+    strategy_methods = [
+        (strategy, method)
+        for strategy, method in (
+            (name, getattr(agent, f'_parse_{name}', None))
+            for name in ('table_parser', 'text_extraction', 'fallback_heuristic')
+        )
+        if method is not None
+    ]
+    
     # Test problematic inputs that could break the old system
     problematic_inputs = [
         {
@@ -225,13 +241,11 @@ def demo_error_resilience():
             strategies_tried = []
             results = []
             
-            for strategy in ['table_parser', 'text_extraction', 'fallback_heuristic']:
+            for strategy, method in strategy_methods:
                 try:
-                    if hasattr(agent, f'_parse_{strategy}'):
-                        method = getattr(agent, f'_parse_{strategy}')
-                        result = method('https://test.com', 'TEST123', soup, None)
-                        strategies_tried.append(strategy)
-                        results.append(result)
+                    result = method('https://test.com', 'TEST123', soup, None)
+                    strategies_tried.append(strategy)
+                    results.append(result)
                 except Exception as e:
                     continue
             
@@ -262,12 +276,14 @@ def main():
     print("=" * 80)
     
     try:
-        # Run all demonstrations
-        demo_brand_registry()
-        demo_parsing_strategies()
-        demo_concatenated_text_parsing()
-        demo_multi_brand_support()
-        demo_error_resilience()
+        # Run all demonstrations (independent, so they run concurrently)
+        run_demo_sections([
+            demo_brand_registry,
+            demo_parsing_strategies,
+            demo_concatenated_text_parsing,
+            demo_multi_brand_support,
+            demo_error_resilience,
+        ])
         
         # Final summary
         print(f"\n🎉 SYSTEM ENHANCEMENT SUMMARY")
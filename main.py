@@ -5,18 +5,28 @@ import pandas as pd
 import json
 import time
 import re
+import itertools
+import importlib.util
+import threading
 import concurrent.futures
+from html import escape
 from dotenv import load_dotenv
 
 # Import our classes and config variables from other files
-import config
+from config import (
+    SOURCE_PRODUCTS_FILE_PATH, EXISTING_STORE_SKUS_CSV_PATH, EXISTING_DESCRIPTIONS_CSV_PATH,
+    PART_NUMBER_COLUMN_SOURCE, BRAND_COLUMN_SOURCE, APPLICATION_COLUMN_SOURCE,
+    DESCRIPTION_COLUMN_EN_SOURCE, QTY_COLUMN_SOURCE, PRICE_COLUMN_SOURCE,
+    SKU_COLUMN_STORE_EXPORT, SKU_COLUMN_EXISTING_DESC_EXPORT, HTML_DESCRIPTION_COLUMN_EXISTING_DESC_EXPORT,
+    GEMINI_MODEL_NAME, MAX_PRODUCTS_TO_PROCESS_IN_BATCH, MAX_CONCURRENT_WORKERS
+)
 from agents.image_agent import ImageSourcingAgent
 from agents.bigcommerce_agent import BigCommerceUploaderAgent
 from agents.vehicle_application_agent import VehicleApplicationAgent
 
 # Import monitoring and logging
 from monitoring import (
-    performance_monitor, OperationTimer, 
+    get_performance_monitor, OperationTimer, 
     get_main_logger, LogContext
 )
 
@@ -24,45 +34,111 @@ from monitoring import (
 from google.cloud import translate_v2 as translate
 import google.generativeai as genai
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Faster native parsers when installed; pandas' default engines otherwise
+EXCEL_READ_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+CSV_READ_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+EXCEL_WRITE_ENGINE = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else 'openpyxl'
+
+# Patterns used once per product by the worker threads
+_DESC_PREFIX_RE = re.compile(r'^\s*Descripción del Producto:\s*', re.IGNORECASE)
+_APP_SPLIT_RE = re.compile(r'[;\r\n]+')
+_JSON_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.IGNORECASE)
+
+
+def load_source_products(path_or_buf, as_records=True):
+    """Loads product data from the source Excel file (a path or a binary file-like object).
 
-def load_source_products(file_path):
-    """Loads product data from the source Excel file."""
+    Returns a list of row dicts, or the DataFrame itself when as_records is False.
+    """
     try:
-        df = pd.read_excel(file_path, dtype=str).fillna('')
+        df = pd.read_excel(path_or_buf, dtype=str, engine=EXCEL_READ_ENGINE).fillna('')
         required_cols = [
-            config.PART_NUMBER_COLUMN_SOURCE, config.BRAND_COLUMN_SOURCE, 
-            config.APPLICATION_COLUMN_SOURCE, config.DESCRIPTION_COLUMN_EN_SOURCE,
-            config.QTY_COLUMN_SOURCE, config.PRICE_COLUMN_SOURCE
+            PART_NUMBER_COLUMN_SOURCE, BRAND_COLUMN_SOURCE, 
+            APPLICATION_COLUMN_SOURCE, DESCRIPTION_COLUMN_EN_SOURCE,
+            QTY_COLUMN_SOURCE, PRICE_COLUMN_SOURCE
         ]
         if not all(col in df.columns for col in required_cols):
             raise ValueError("A required column is missing in the source Excel file.")
         
-        df['sanitized_part_number'] = df[config.PART_NUMBER_COLUMN_SOURCE]
+        df['sanitized_part_number'] = df[PART_NUMBER_COLUMN_SOURCE]
         df['original_excel_row'] = df.index + 2
-        return df.to_dict('records')
+        return df.to_dict('records') if as_records else df
     except Exception as e:
         print(f"ERROR loading source Excel file: {e}")
-        return []
+        return [] if as_records else pd.DataFrame()
+
+def encode_log_line(log_entry):
+    """Serializes a batch log entry as one UTF-8 JSON line (orjson when available)."""
+    if orjson:
+        return orjson.dumps(log_entry, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY)
+    return (json.dumps(log_entry, ensure_ascii=False) + '\n').encode('utf-8')
+
+def batch_translate_texts(texts, client, chunk_size=128):
+    """Translates many texts to Spanish in as few Google Translate calls as possible.
 
-def translate_text(text, client):
-    """Translates text to Spanish using Google Translate."""
+    Returns a dict mapping each unique source text to its translation. Chunks that
+    fail are left out so callers fall back to per-item translation.
+    """
+    if not client: return {}
+    unique_texts = list(dict.fromkeys(t for t in texts if t and isinstance(t, str)))
+    translations = {}
+    for start in range(0, len(unique_texts), chunk_size):
+        chunk = unique_texts[start:start + chunk_size]
+        try:
+            results = client.translate(chunk, target_language='es', source_language='en')
+            for text, result in zip(chunk, results):
+                translations[text] = result['translatedText']
+        except Exception as e:
+            print(f"  Batch Translate Error for {len(chunk)} names: {e}")
+    return translations
+
+def load_existing_skus(file_path):
+    """Loads the set of SKUs already present in the store export."""
+    # Store exports are wide; only the SKU column is parsed
+    df_skus = pd.read_csv(file_path, engine=CSV_READ_ENGINE, usecols=[SKU_COLUMN_STORE_EXPORT])
+    return set(df_skus[SKU_COLUMN_STORE_EXPORT].dropna().astype(str))
+
+def load_existing_descriptions(file_path):
+    """Loads existing HTML descriptions keyed by SKU from the description export."""
+    df_descs = pd.read_csv(file_path, engine=CSV_READ_ENGINE,
+                           usecols=[SKU_COLUMN_EXISTING_DESC_EXPORT, HTML_DESCRIPTION_COLUMN_EXISTING_DESC_EXPORT])
+    skus = df_descs[SKU_COLUMN_EXISTING_DESC_EXPORT].astype(str).to_numpy()
+    descriptions = df_descs[HTML_DESCRIPTION_COLUMN_EXISTING_DESC_EXPORT].to_numpy()
+    return dict(zip(skus.tolist(), descriptions.tolist()))
+
+def translate_text(text, client, translations_cache=None):
+    """Translates text to Spanish using Google Translate.
+
+    translations_cache is the run's dict of successful translations (see
+    batch_translate_texts); hits skip the request and new results are added to it.
+    """
     if not client or not text or not isinstance(text, str): return ""
+    if translations_cache is not None:
+        cached = translations_cache.get(text)
+        if cached is not None:
+            return cached
     try:
         result = client.translate(text, target_language='es', source_language='en')
+        if translations_cache is not None:
+            translations_cache[text] = result['translatedText']
         return result['translatedText']
     except Exception as e:
         print(f"  Name Translate Error for '{str(text)[:30]}...': {e}")
         return f"SPANISH_NAME_ERROR: {text}"
 
-def generate_description(product_data, gemini_model, official_applications=None):
-    """Generates a product description using Google Gemini with enhanced vehicle applications."""
-    if not gemini_model: return "LLM model not available for description."
-    
-    name_es = product_data.get('Name_ES_for_BC', "este producto")
-    brand = product_data.get(config.BRAND_COLUMN_SOURCE, "")
-    sku = product_data.get(config.PART_NUMBER_COLUMN_SOURCE, "")
-    app_context = product_data.get(config.APPLICATION_COLUMN_SOURCE, "")
-    orig_en_desc = product_data.get(config.DESCRIPTION_COLUMN_EN_SOURCE, "")
+def build_product_info(product_data, official_applications=None):
+    """Builds the product information block shared by the single and batched Gemini prompts."""
+    get = product_data.get
+    name_es = get('Name_ES_for_BC', "este producto")
+    brand = get(BRAND_COLUMN_SOURCE, "")
+    sku = get(PART_NUMBER_COLUMN_SOURCE, "")
+    app_context = get(APPLICATION_COLUMN_SOURCE, "")
+    orig_en_desc = get(DESCRIPTION_COLUMN_EN_SOURCE, "")
     
     # Enhanced application context with official data
     enhanced_app_context = app_context
@@ -73,182 +149,302 @@ def generate_description(product_data, gemini_model, official_applications=None)
             if app_context:
                 enhanced_app_context += f" | Aplicaciones Adicionales: {app_context}"
 
+    return f"""- Nombre del Producto (en español): {name_es}
+- Marca: {brand}
+- SKU (Número de Parte): {sku}
+- Contexto de Aplicación General: {enhanced_app_context}
+- Características/Nombre en Inglés (para referencia): {orig_en_desc}"""
+
+def clean_generated_description(gen_text):
+    """Strips quotes and a leading 'Descripción del Producto:' label from Gemini output."""
+    return _DESC_PREFIX_RE.sub('', gen_text.strip().replace('"', '')).strip()
+
+def generate_description(product_data, gemini_model, official_applications=None):
+    """Generates a product description using Google Gemini with enhanced vehicle applications."""
+    if not gemini_model: return "LLM model not available for description."
+    
     prompt = f"""Eres un redactor experto de marketing para una tienda de refacciones de autos de alto rendimiento en México.
 Tu tarea es generar un párrafo descriptivo principal, atractivo y detallado, en español, para el siguiente artículo.
 NO listes explícitamente las 'Aplicaciones' o vehículos compatibles; enfócate en describir el producto, sus características, beneficios y la calidad de la marca.
 El tono debe ser profesional y entusiasta. Usa de 2 a 4 frases. No incluyas el precio.
 
 Información del Producto Base:
-- Nombre del Producto (en español): {name_es}
-- Marca: {brand}
-- SKU (Número de Parte): {sku}
-- Contexto de Aplicación General: {enhanced_app_context}
-- Características/Nombre en Inglés (para referencia): {orig_en_desc}
+{build_product_info(product_data, official_applications)}
 
 Genera únicamente el párrafo descriptivo principal en español:
 """
     try:
         response = gemini_model.generate_content(prompt)
-        gen_text = response.text.strip().replace('"', '')
-        return re.sub(r'^\s*Descripción del Producto:\s*', '', gen_text, flags=re.IGNORECASE).strip()
+        return clean_generated_description(response.text)
     except Exception as e:
         return f"Error LLM desc: {str(e)}"
 
+def generate_descriptions_batch(requests_batch, gemini_model):
+    """Generates descriptions for several products with a single Gemini request.
+
+    requests_batch is a list of (product_data, official_applications) pairs. Returns a
+    list of descriptions in the same order, or None if the response could not be used.
+    """
+    product_blocks = "\n\n".join(
+        f"Artículo {i}:\n{build_product_info(product_data, official_applications)}"
+        for i, (product_data, official_applications) in enumerate(requests_batch, 1)
+    )
+    prompt = f"""Eres un redactor experto de marketing para una tienda de refacciones de autos de alto rendimiento en México.
+Tu tarea es generar un párrafo descriptivo principal, atractivo y detallado, en español, para cada uno de los siguientes {len(requests_batch)} artículos.
+NO listes explícitamente las 'Aplicaciones' o vehículos compatibles; enfócate en describir el producto, sus características, beneficios y la calidad de la marca.
+El tono debe ser profesional y entusiasta. Usa de 2 a 4 frases por artículo. No incluyas el precio.
+
+{product_blocks}
+
+Responde únicamente con un arreglo JSON de {len(requests_batch)} cadenas, una por artículo y en el mismo orden:
+"""
+    try:
+        response = gemini_model.generate_content(prompt)
+        paragraphs = json.loads(_JSON_FENCE_RE.sub('', response.text.strip()))
+    except Exception as e:
+        print(f"  Batched description request failed for {len(requests_batch)} products: {e}")
+        return None
+    if not isinstance(paragraphs, list) or len(paragraphs) != len(requests_batch) \
+            or not all(isinstance(p, str) and p.strip() for p in paragraphs):
+        return None
+    return [clean_generated_description(p) for p in paragraphs]
+
+class _DescriptionRequest:
+    __slots__ = ('product_data', 'official_applications', 'done', 'result')
+
+    def __init__(self, product_data, official_applications):
+        self.product_data = product_data
+        self.official_applications = official_applications
+        self.done = threading.Event()
+        self.result = None
+
+class DescriptionBatcher:
+    """Coalesces concurrent generate_description calls from worker threads into batched
+    Gemini requests. A batch is sent once batch_size requests are waiting or the oldest
+    has waited max_wait seconds; products missing from a batched reply fall back to a
+    single-product request. With batch_size <= 1 nothing can be coalesced, so each call
+    goes straight to a single-product request without waiting."""
+
+    def __init__(self, gemini_model, batch_size=8, max_wait=0.5):
+        self.gemini_model = gemini_model
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def generate(self, product_data, official_applications=None):
+        if not self.gemini_model: return generate_description(product_data, None)
+        if self.batch_size <= 1:
+            return generate_description(product_data, self.gemini_model, official_applications)
+        
+        request = _DescriptionRequest(product_data, official_applications)
+        batch = None
+        with self._lock:
+            self._pending.append(request)
+            if len(self._pending) >= self.batch_size:
+                batch, self._pending = self._pending, []
+        
+        if batch is None and not request.done.wait(self.max_wait):
+            # Nobody flushed in time: send whatever is pending, including this request
+            with self._lock:
+                if request in self._pending:
+                    batch, self._pending = self._pending, []
+        
+        if batch:
+            self._run_batch(batch)
+        request.done.wait()
+        return request.result
+
+    def _run_batch(self, batch):
+        try:
+            results = None
+            if len(batch) > 1:
+                results = generate_descriptions_batch(
+                    [(r.product_data, r.official_applications) for r in batch], self.gemini_model
+                )
+            for i, request in enumerate(batch):
+                request.result = results[i] if results else generate_description(
+                    request.product_data, self.gemini_model, request.official_applications
+                )
+        finally:
+            for request in batch:
+                request.done.set()
+
 def merge_applications(official_apps, excel_apps):
     """Merge official and Excel applications, prioritizing official data"""
     if not official_apps and not excel_apps:
         return []
     
-    # Convert Excel apps to display format
-    excel_display = []
-    if excel_apps:
-        for app in excel_apps:
-            app_clean = app.strip()
-            if app_clean and len(app_clean) > 2:
-                excel_display.append(app_clean)
-    
-    # Convert official apps to display format
-    official_display = []
-    if official_apps:
-        official_display = [app.to_display_string() for app in official_apps]
+    # Official apps first, then Excel apps long enough to be meaningful
+    official_display = (app.to_display_string() for app in official_apps or ())
+    excel_display = (app_clean for app_clean in (app.strip() for app in excel_apps or ()) if len(app_clean) > 2)
     
-    # Combine, prioritizing official data
-    all_apps = official_display + excel_display
+    # Remove case-insensitive duplicates while preserving order and first casing
+    unique_apps = {}
+    for app in itertools.chain(official_display, excel_display):
+        unique_apps.setdefault(app.lower(), app)
     
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_apps = []
-    for app in all_apps:
-        app_lower = app.lower()
-        if app_lower not in seen:
-            seen.add(app_lower)
-            unique_apps.append(app)
-    
-    return unique_apps
+    return list(unique_apps.values())
+
+def upload_product_images(bc_agent, product_id, img_paths, alt_text):
+    """Uploads a product's images concurrently; the first image is the thumbnail.
+
+    Returns the number of images uploaded successfully.
+    """
+    def upload_one(i, path):
+        return bool(bc_agent.upload_product_image(product_id, path, is_thumbnail=(i == 0), image_alt_text=alt_text))
+
+    if len(img_paths) == 1:
+        return int(upload_one(0, img_paths[0]))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(img_paths)) as uploader:
+        futures = [uploader.submit(upload_one, i, path) for i, path in enumerate(img_paths)]
+        return sum(future.result() for future in futures)
 
 def process_single_product(product_data, agents):
     """Encapsulates the entire pipeline for a single product."""
-    sku = product_data.get(config.PART_NUMBER_COLUMN_SOURCE, "UNKNOWN_SKU")
+    get = product_data.get
+    sku = get(PART_NUMBER_COLUMN_SOURCE, "UNKNOWN_SKU")
+    source_row = get('original_excel_row', 'N/A')
     logger = get_main_logger()
     
-    with LogContext(logger, sku=sku, row=product_data.get('original_excel_row', 'N/A')):
+    with LogContext(logger, sku=sku, row=source_row):
         logger.info(f"Starting to process SKU: {sku}")
         
         log_entry = {
             "source_sku": sku, 
-            "source_row": product_data.get('original_excel_row', 'N/A'),
+            "source_row": source_row,
             "status": "Started", "bc_product_id": None, "images_sourced_paths": [],
             "images_uploaded_count": 0, "product_name_es": "", "description_source": "", 
             "notes": []
         }
     
+        # Steps are timed inline and reported to the monitor in one call at the end
+        perf_counter = time.perf_counter
+        timings = []
+        step = None
+        
         try:
             # Pipeline 1: Image Sourcing
-            with OperationTimer('main', 'image_sourcing', {'sku': sku}):
-                logger.info("Starting image sourcing pipeline")
-                img_paths = agents['image'].find_product_images(product_data, max_images_per_product=1)
-                product_data['processed_image_paths'] = img_paths
-                log_entry['images_sourced_paths'] = img_paths
-                if not img_paths: 
-                    log_entry['notes'].append("No images sourced.")
-                    logger.warning("No images sourced for product")
-                else:
-                    logger.success(f"Sourced {len(img_paths)} images")
+            step, step_start = 'image_sourcing', perf_counter()
+            logger.info("Starting image sourcing pipeline")
+            img_paths = agents['image'].find_product_images(product_data, max_images_per_product=1)
+            product_data['processed_image_paths'] = img_paths
+            log_entry['images_sourced_paths'] = img_paths
+            if not img_paths: 
+                log_entry['notes'].append("No images sourced.")
+                logger.warning("No images sourced for product")
+            else:
+                logger.success(f"Sourced {len(img_paths)} images")
+            timings.append((step, step_start, perf_counter(), None))
 
             # Pipeline 2: Spanish Product Name
-            with OperationTimer('main', 'translation', {'sku': sku}):
-                logger.info("Starting product name translation")
-                name_es = translate_text(product_data.get(config.DESCRIPTION_COLUMN_EN_SOURCE, ""), agents['translate'])
-                product_data['Name_ES_for_BC'] = name_es
-                log_entry['product_name_es'] = name_es
-                if name_es and not name_es.startswith('SPANISH_NAME_ERROR'):
-                    logger.success("Product name translated successfully")
-                else:
-                    logger.warning("Product name translation failed or had issues")
+            step, step_start = 'translation', perf_counter()
+            logger.info("Starting product name translation")
+            name_es = translate_text(
+                get(DESCRIPTION_COLUMN_EN_SOURCE, ""), agents['translate'],
+                agents.get('translations')
+            )
+            product_data['Name_ES_for_BC'] = name_es
+            log_entry['product_name_es'] = name_es
+            if name_es and not name_es.startswith('SPANISH_NAME_ERROR'):
+                logger.success("Product name translated successfully")
+            else:
+                logger.warning("Product name translation failed or had issues")
+            timings.append((step, step_start, perf_counter(), None))
 
             # Pipeline 3: Vehicle Applications Extraction (NEW)
             official_applications = []
             if 'vehicle_app' in agents:
-                with OperationTimer('main', 'vehicle_applications', {'sku': sku}):
-                    try:
-                        logger.info("Starting vehicle applications extraction")
-                        official_applications = agents['vehicle_app'].find_and_extract_applications(
-                            product_data, agents.get('image')
-                        )
-                        log_entry['official_applications_found'] = len(official_applications)
-                        if official_applications:
-                            logger.success(f"Found {len(official_applications)} official vehicle applications")
-                        else:
-                            logger.info("No official vehicle applications found")
-                    except Exception as e:
-                        logger.error(f"Vehicle application extraction failed: {e}")
-                        log_entry['official_applications_found'] = 0
+                step, step_start = 'vehicle_applications', perf_counter()
+                try:
+                    logger.info("Starting vehicle applications extraction")
+                    official_applications = agents['vehicle_app'].find_and_extract_applications(
+                        product_data, agents.get('image')
+                    )
+                    log_entry['official_applications_found'] = len(official_applications)
+                    if official_applications:
+                        logger.success(f"Found {len(official_applications)} official vehicle applications")
+                    else:
+                        logger.info("No official vehicle applications found")
+                except Exception as e:
+                    logger.error(f"Vehicle application extraction failed: {e}")
+                    log_entry['official_applications_found'] = 0
+                timings.append((step, step_start, perf_counter(), None))
 
             # Pipeline 4: Enhanced Spanish Product Description
-            with OperationTimer('main', 'description_generation', {'sku': sku}):
-                logger.info("Starting product description generation")
-                if sku in agents['existing_descs'] and agents['existing_descs'][sku].strip():
-                    full_desc_es = agents['existing_descs'][sku]
-                    log_entry['description_source'] = "ClientExport"
-                    logger.info("Using existing description from client export")
+            step, step_start = 'description_generation', perf_counter()
+            logger.info("Starting product description generation")
+            if sku in agents['existing_descs'] and agents['existing_descs'][sku].strip():
+                full_desc_es = agents['existing_descs'][sku]
+                log_entry['description_source'] = "ClientExport"
+                logger.info("Using existing description from client export")
+            else:
+                if 'description_batcher' in agents:
+                    gemini_paragraph = agents['description_batcher'].generate(product_data, official_applications)
                 else:
                     gemini_paragraph = generate_description(product_data, agents['gemini'], official_applications)
                     
-                    # Merge official and Excel applications
-                    excel_apps = []
-                    app_string = product_data.get(config.APPLICATION_COLUMN_SOURCE, "").strip()
-                    if app_string:
-                        excel_apps = [a.strip() for a in app_string.replace(';', '\n').splitlines() if a.strip()]
+                # Merge official and Excel applications
+                excel_apps = []
+                app_string = get(APPLICATION_COLUMN_SOURCE, "").strip()
+                if app_string:
+                    excel_apps = [a.strip() for a in _APP_SPLIT_RE.split(app_string) if a.strip()]
                     
-                    merged_apps = merge_applications(official_applications, excel_apps)
+                merged_apps = merge_applications(official_applications, excel_apps)
                     
-                    # Generate HTML for applications
-                    app_html = ""
-                    if merged_apps:
-                        app_html = "<p><strong>Aplicaciones:</strong></p><ul>" + "".join(f"<li>{item}</li>" for item in merged_apps) + "</ul>"
+                # Generate HTML for applications
+                app_html = ""
+                if merged_apps:
+                    app_html = "<p><strong>Aplicaciones:</strong></p><ul>{}</ul>".format(
+                        "".join(f"<li>{escape(item)}</li>" for item in merged_apps)
+                    )
                     
-                    full_desc_es = f"<p>{gemini_paragraph}</p>{app_html}"
+                full_desc_es = f"<p>{gemini_paragraph}</p>{app_html}"
                     
-                    if official_applications:
-                        log_entry['description_source'] = "GeminiGenerated_Plus_OfficialApps_Plus_ExcelApps"
-                    else:
-                        log_entry['description_source'] = "GeminiGenerated_Plus_ExcelApps"
+                if official_applications:
+                    log_entry['description_source'] = "GeminiGenerated_Plus_OfficialApps_Plus_ExcelApps"
+                else:
+                    log_entry['description_source'] = "GeminiGenerated_Plus_ExcelApps"
                     
-                    logger.success(f"Generated description with {len(merged_apps)} applications")
+                logger.success(f"Generated description with {len(merged_apps)} applications")
+            timings.append((step, step_start, perf_counter(), None))
                     
             product_data['Final_Full_Description_ES_for_BC'] = full_desc_es
 
             # Pipeline 5: BigCommerce Upload
-            with OperationTimer('main', 'bigcommerce_upload', {'sku': sku}):
-                logger.info("Starting BigCommerce product creation")
-                created_prod = agents['bigcommerce'].create_product(product_data, agents['existing_skus'])
-                if created_prod and created_prod.get('id'):
-                    bc_id = created_prod['id']
-                    log_entry['bc_product_id'] = bc_id
-                    log_entry['status'] = "Product Created"
-                    logger.success(f"Product created with ID: {bc_id}")
+            step, step_start = 'bigcommerce_upload', perf_counter()
+            logger.info("Starting BigCommerce product creation")
+            created_prod = agents['bigcommerce'].create_product(product_data, agents['existing_skus'])
+            if created_prod and created_prod.get('id'):
+                bc_id = created_prod['id']
+                log_entry['bc_product_id'] = bc_id
+                log_entry['status'] = "Product Created"
+                logger.success(f"Product created with ID: {bc_id}")
                     
-                    if img_paths:
-                        logger.info(f"Starting image upload for {len(img_paths)} images")
-                        uploaded_count = 0
-                        for i, path in enumerate(img_paths):
-                            if agents['bigcommerce'].upload_product_image(bc_id, path, is_thumbnail=(i==0), image_alt_text=name_es):
-                                uploaded_count += 1
-                        log_entry['images_uploaded_count'] = uploaded_count
-                        if uploaded_count > 0: 
-                            log_entry['status'] += " + Images Uploaded"
-                            logger.success(f"Uploaded {uploaded_count} images")
-                        else:
-                            logger.warning("No images were uploaded successfully")
-                else:
-                    log_entry['status'] = "Failed - Product Creation"
-                    logger.error("Failed to create product in BigCommerce")
+                if img_paths:
+                    logger.info(f"Starting image upload for {len(img_paths)} images")
+                    uploaded_count = upload_product_images(agents['bigcommerce'], bc_id, img_paths, name_es)
+                    log_entry['images_uploaded_count'] = uploaded_count
+                    if uploaded_count > 0: 
+                        log_entry['status'] += " + Images Uploaded"
+                        logger.success(f"Uploaded {uploaded_count} images")
+                    else:
+                        logger.warning("No images were uploaded successfully")
+            else:
+                log_entry['status'] = "Failed - Product Creation"
+                logger.error("Failed to create product in BigCommerce")
+            timings.append((step, step_start, perf_counter(), None))
 
         except Exception as e:
+            if step and (not timings or timings[-1][0] != step):
+                timings.append((step, step_start, perf_counter(), str(e)))
             log_entry['status'] = "Failed - Pipeline Error"
             log_entry['notes'].append(f"Pipeline exception: {str(e)}")
             logger.error(f"Pipeline failed with exception: {e}", error_type=type(e).__name__)
         
+        get_performance_monitor().record_many('main', timings, {'sku': sku})
+        
         logger.info(f"Finished processing SKU: {sku} with Status: {log_entry['status']}")
         return log_entry
 
@@ -282,7 +478,7 @@ def main():
         # --- END OF FIX ---
         
         genai.configure(api_key=GEMINI_API_KEY)
-        gemini_model = genai.GenerativeModel(config.GEMINI_MODEL_NAME)
+        gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
         
         agents = {
             'image': ImageSourcingAgent(SERPAPI_API_KEY),
@@ -298,63 +494,78 @@ def main():
         logger.critical(f"CRITICAL ERROR during initialization: {e}")
         return
 
-    # --- Load Data for Processing ---
+    # --- Load Data for Processing (the three files are read concurrently) ---
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as loader:
+        skus_future = loader.submit(load_existing_skus, EXISTING_STORE_SKUS_CSV_PATH)
+        descs_future = loader.submit(load_existing_descriptions, EXISTING_DESCRIPTIONS_CSV_PATH)
+        source_future = loader.submit(load_source_products, SOURCE_PRODUCTS_FILE_PATH, False)
+
     try:
-        df_skus = pd.read_csv(config.EXISTING_STORE_SKUS_CSV_PATH)
-        agents['existing_skus'] = set(df_skus[config.SKU_COLUMN_STORE_EXPORT].dropna().astype(str))
+        agents['existing_skus'] = skus_future.result()
         logger.info(f"Loaded {len(agents['existing_skus'])} existing SKUs")
 
-        df_descs = pd.read_csv(config.EXISTING_DESCRIPTIONS_CSV_PATH)
-        agents['existing_descs'] = pd.Series(
-            df_descs[config.HTML_DESCRIPTION_COLUMN_EXISTING_DESC_EXPORT].values,
-            index=df_descs[config.SKU_COLUMN_EXISTING_DESC_EXPORT].astype(str)
-        ).to_dict()
+        agents['existing_descs'] = descs_future.result()
         logger.info(f"Loaded {len(agents['existing_descs'])} existing descriptions")
     except Exception as e:
         logger.warning(f"Could not load data files: {e}")
 
-    all_source_products = load_source_products(config.SOURCE_PRODUCTS_FILE_PATH)
-    if not all_source_products: return
+    source_df = source_future.result()
+    if source_df.empty: return
 
-    new_products = [
-        p for p in all_source_products 
-        if p.get(config.PART_NUMBER_COLUMN_SOURCE) and 
-           p.get(config.PART_NUMBER_COLUMN_SOURCE) not in agents['existing_skus']
-    ]
-    logger.info(f"Found {len(new_products)} NEW products to process")
+    # Filter on the DataFrame and only build row dicts for the batch being processed
+    part_numbers = source_df[PART_NUMBER_COLUMN_SOURCE]
+    new_mask = (part_numbers != '') & ~part_numbers.isin(agents['existing_skus'])
+    logger.info(f"Found {int(new_mask.sum())} NEW products to process")
 
-    batch_to_process = new_products[:config.MAX_PRODUCTS_TO_PROCESS_IN_BATCH]
+    batch_to_process = source_df.loc[new_mask].head(MAX_PRODUCTS_TO_PROCESS_IN_BATCH).to_dict('records')
     if not batch_to_process:
         logger.info("No new products to process in this batch")
         return
 
-    # --- Run Concurrent Processing ---
+    # --- Translate Product Names Upfront (one request per chunk instead of per SKU) ---
+    with OperationTimer('main', 'batch_translation', {'batch_size': len(batch_to_process)}):
+        agents['translations'] = batch_translate_texts(
+            [p.get(DESCRIPTION_COLUMN_EN_SOURCE, "") for p in batch_to_process],
+            agents['translate']
+        )
+    logger.info(f"Pre-translated {len(agents['translations'])} unique product names")
+
+    # Never wait for more descriptions than can be in flight at once
+    agents['description_batcher'] = DescriptionBatcher(
+        agents['gemini'], batch_size=min(len(batch_to_process), MAX_CONCURRENT_WORKERS, 8)
+    )
+
+    # --- Run Concurrent Processing (each result is streamed to a JSON Lines log) ---
     logger.business(f"Starting CONCURRENT Batch Processing for {len(batch_to_process)} products")
-    batch_log = []
+    log_filename = f"batch_upload_log_{time.strftime('%Y%m%d_%H%M%S')}"
+    processed_products = 0
+    successful_products = 0
     
-    with OperationTimer('main', 'batch_processing', {'batch_size': len(batch_to_process)}):
-        with concurrent.futures.ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_WORKERS) as executor:
-            future_to_product = {executor.submit(process_single_product, p, agents): p for p in batch_to_process}
-            for future in concurrent.futures.as_completed(future_to_product):
-                batch_log.append(future.result())
+    with open(f"{log_filename}.jsonl", 'wb') as log_file:
+        with OperationTimer('main', 'batch_processing', {'batch_size': len(batch_to_process)}):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WORKERS) as executor:
+                future_to_product = {executor.submit(process_single_product, p, agents): p for p in batch_to_process}
+                for future in concurrent.futures.as_completed(future_to_product):
+                    log_entry = future.result()
+                    log_file.write(encode_log_line(log_entry))
+                    processed_products += 1
+                    if 'Failed' not in log_entry.get('status', ''):
+                        successful_products += 1
 
     # --- Save Logs ---
     logger.business("BATCH PROCESSING COMPLETE")
     
     # Calculate success metrics
-    successful_products = sum(1 for entry in batch_log if 'Failed' not in entry.get('status', ''))
-    success_rate = (successful_products / len(batch_log)) * 100 if batch_log else 0
-    
-    logger.performance(f"Batch completed with {successful_products}/{len(batch_log)} successful products ({success_rate:.1f}% success rate)")
-    
-    log_filename = f"batch_upload_log_{time.strftime('%Y%m%d_%H%M%S')}"
+    success_rate = (successful_products / processed_products) * 100 if processed_products else 0
     
-    with open(f"{log_filename}.json", 'w', encoding='utf-8') as f:
-        json.dump(batch_log, f, ensure_ascii=False, indent=4)
-    logger.info(f"Full batch log saved to {log_filename}.json")
+    logger.performance(f"Batch completed with {successful_products}/{processed_products} successful products ({success_rate:.1f}% success rate)")
+    logger.info(f"Full batch log saved to {log_filename}.jsonl")
 
     try:
-        pd.DataFrame(batch_log).to_excel(f"{log_filename}.xlsx", index=False, engine='openpyxl')
+        loads = orjson.loads if orjson else json.loads
+        with open(f"{log_filename}.jsonl", 'rb') as log_file:
+            log_df = pd.DataFrame(loads(line) for line in log_file)
+        log_df.to_excel(f"{log_filename}.xlsx", index=False, engine=EXCEL_WRITE_ENGINE)
         logger.info(f"Batch log also saved to {log_filename}.xlsx")
     except Exception as e:
         logger.error(f"Error saving log to Excel: {e}")
@@ -8,7 +8,9 @@ This package provides comprehensive monitoring capabilities including:
 - Failure analysis and alerting
 """
 
-from .performance_monitor import performance_monitor, OperationTimer, monitor_operation
+from .performance_monitor import (
+    performance_monitor, get_performance_monitor, OperationTimer, monitor_operation
+)
 from .logging_system import (
     get_logger, get_main_logger, get_image_logger, get_vehicle_logger, 
     get_bigcommerce_logger, get_ui_logger, LogContext, log_operation
@@ -16,6 +18,7 @@ from .logging_system import (
 
 __all__ = [
     'performance_monitor',
+    'get_performance_monitor',
     'OperationTimer', 
     'monitor_operation',
     'get_logger',
@@ -6,33 +6,75 @@ Provides real-time metrics and performance analytics
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import json
 import os
+from collections import deque
+from dataclasses import asdict
 from typing import Dict, List, Any
 
-from monitoring.performance_monitor import performance_monitor
+from monitoring.performance_monitor import performance_monitor, PerformanceStats
 from monitoring.logging_system import get_logger
 
+def stats_to_frame(stats: Dict[str, PerformanceStats]) -> pd.DataFrame:
+    """Build one DataFrame (indexed by agent_operation key) from a stats dict"""
+    return pd.DataFrame.from_records([asdict(stat) for stat in stats.values()], index=list(stats))
+
+def summarize_stats_frame(stats_df: pd.DataFrame) -> Dict[str, float]:
+    """Aggregate totals, success rate and weighted average duration over all operations"""
+    total_ops = int(stats_df['total_operations'].sum())
+    total_successful = int(stats_df['successful_operations'].sum())
+    weighted_duration = (stats_df['average_duration'] * stats_df['total_operations']).sum()
+    return {
+        'total_operations': total_ops,
+        'successful_operations': total_successful,
+        'success_rate': (total_successful / total_ops * 100) if total_ops > 0 else 0,
+        'average_duration': weighted_duration / total_ops if total_ops > 0 else 0
+    }
+
+@st.cache_data(ttl=30, show_spinner=False)
+def compute_stats_frame(hours: int) -> pd.DataFrame:
+    """Scan the monitor for the last `hours` and return the stats frame (cached for 30s)"""
+    return stats_to_frame(performance_monitor.get_performance_stats(hours=hours))
+
+@st.cache_data(ttl=30, show_spinner=False)
+def compute_failure_frame(hours: int, limit: int) -> pd.DataFrame:
+    """Collect recent failures into a display-ready frame (cached for 30s)"""
+    failures = performance_monitor.get_recent_failures(hours=hours, limit=limit)
+    if not failures:
+        return pd.DataFrame()
+    
+    raw_df = pd.DataFrame.from_records([asdict(failure) for failure in failures])
+    return pd.DataFrame({
+        'Timestamp': raw_df['timestamp'].map(datetime.fromtimestamp).dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'Agent': raw_df['agent'],
+        'Operation': raw_df['operation'],
+        'Duration': raw_df['duration'].map('{:.2f}s'.format),
+        'Error': raw_df['metadata'].str.get('error').fillna('Unknown error')
+    })
+
+@st.cache_data(ttl=30, show_spinner=False)
+def compute_trend_frames(periods: tuple) -> Dict[int, pd.DataFrame]:
+    """Stats frames for several windows from a single monitor scan (cached for 30s)"""
+    stats_by_window = performance_monitor.get_performance_stats_multi(windows=periods)
+    return {hours: stats_to_frame(stats) for hours, stats in stats_by_window.items()}
+
 def display_system_overview():
     """Display system overview metrics"""
     st.header("📊 System Performance Overview")
     
     # Get performance stats for last 24 hours
-    stats = performance_monitor.get_performance_stats(hours=24)
+    stats_df = compute_stats_frame(24)
     
-    if not stats:
+    if stats_df.empty:
         st.warning("No performance data available yet. Run some operations to see metrics.")
         return
     
     # Calculate overall metrics
-    total_ops = sum(stat.total_operations for stat in stats.values())
-    total_successful = sum(stat.successful_operations for stat in stats.values())
-    overall_success_rate = (total_successful / total_ops * 100) if total_ops > 0 else 0
-    avg_duration = sum(stat.average_duration * stat.total_operations for stat in stats.values()) / total_ops if total_ops > 0 else 0
+    summary = summarize_stats_frame(stats_df)
+    total_ops = summary['total_operations']
+    overall_success_rate = summary['success_rate']
+    avg_duration = summary['average_duration']
     
     # Display key metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -53,27 +95,25 @@ def display_system_overview():
 
 def display_agent_performance():
     """Display per-agent performance metrics"""
+    import plotly.express as px  # imported lazily; only chart pages need Plotly
+    
     st.header("🤖 Agent Performance Breakdown")
     
-    stats = performance_monitor.get_performance_stats(hours=24)
+    stats_df = compute_stats_frame(24)
     
-    if not stats:
+    if stats_df.empty:
         return
     
     # Prepare data for visualization
-    agent_data = []
-    for key, stat in stats.items():
-        agent, operation = key.split('_', 1)
-        agent_data.append({
-            'Agent': agent,
-            'Operation': operation,
-            'Total Operations': stat.total_operations,
-            'Success Rate': stat.success_rate * 100,
-            'Avg Duration': stat.average_duration,
-            'Failed Operations': stat.failed_operations
-        })
-    
-    df = pd.DataFrame(agent_data)
+    key_parts = stats_df.index.str.split('_', n=1)
+    df = pd.DataFrame({
+        'Agent': key_parts.str[0],
+        'Operation': key_parts.str[1],
+        'Total Operations': stats_df['total_operations'].to_numpy(),
+        'Success Rate': stats_df['success_rate'].to_numpy() * 100,
+        'Avg Duration': stats_df['average_duration'].to_numpy(),
+        'Failed Operations': stats_df['failed_operations'].to_numpy()
+    })
     
     if df.empty:
         return
@@ -100,27 +140,16 @@ def display_agent_performance():
 
 def display_failure_analysis():
     """Display failure analysis"""
+    import plotly.express as px  # imported lazily; only chart pages need Plotly
+    
     st.header("🔍 Failure Analysis")
     
-    failures = performance_monitor.get_recent_failures(hours=24, limit=50)
+    failure_df = compute_failure_frame(24, 50)
     
-    if not failures:
+    if failure_df.empty:
         st.success("No failures in the last 24 hours! 🎉")
         return
     
-    # Prepare failure data
-    failure_data = []
-    for failure in failures:
-        failure_data.append({
-            'Timestamp': datetime.fromtimestamp(failure.timestamp).strftime('%Y-%m-%d %H:%M:%S'),
-            'Agent': failure.agent,
-            'Operation': failure.operation,
-            'Duration': f"{failure.duration:.2f}s",
-            'Error': failure.metadata.get('error', 'Unknown error')
-        })
-    
-    failure_df = pd.DataFrame(failure_data)
-    
     # Failure count by agent
     col1, col2 = st.columns(2)
     
@@ -144,27 +173,27 @@ def display_failure_analysis():
 
 def display_performance_trends():
     """Display performance trends over time"""
+    import plotly.express as px  # imported lazily; only chart pages need Plotly
+    
     st.header("📈 Performance Trends")
     
     # Get metrics from different time periods
-    periods = [1, 6, 24, 168]  # 1h, 6h, 24h, 1 week
+    periods = (1, 6, 24, 168)  # 1h, 6h, 24h, 1 week
     trend_data = []
+    trend_frames = compute_trend_frames(periods)
     
     for hours in periods:
-        stats = performance_monitor.get_performance_stats(hours=hours)
-        if stats:
-            total_ops = sum(stat.total_operations for stat in stats.values())
-            successful_ops = sum(stat.successful_operations for stat in stats.values())
-            success_rate = (successful_ops / total_ops * 100) if total_ops > 0 else 0
-            avg_duration = sum(stat.average_duration * stat.total_operations for stat in stats.values()) / total_ops if total_ops > 0 else 0
+        stats_df = trend_frames[hours]
+        if not stats_df.empty:
+            summary = summarize_stats_frame(stats_df)
             
             period_label = f"{hours}h" if hours < 24 else f"{hours//24}d"
             trend_data.append({
                 'Period': period_label,
                 'Hours': hours,
-                'Total Operations': total_ops,
-                'Success Rate': success_rate,
-                'Average Duration': avg_duration
+                'Total Operations': summary['total_operations'],
+                'Success Rate': summary['success_rate'],
+                'Average Duration': summary['average_duration']
             })
     
     if trend_data:
@@ -193,19 +222,18 @@ def display_log_analysis():
         st.warning("No log directory found. Run some operations to generate logs.")
         return
     
-    # List available log files
+    # List available log files (one stat per entry)
     log_files = []
-    for filename in os.listdir(logs_dir):
-        if filename.endswith('.log') or filename.endswith('.jsonl'):
-            filepath = os.path.join(logs_dir, filename)
-            size = os.path.getsize(filepath)
-            modified = datetime.fromtimestamp(os.path.getmtime(filepath))
-            log_files.append({
-                'Filename': filename,
-                'Size': f"{size / 1024:.1f} KB",
-                'Last Modified': modified.strftime('%Y-%m-%d %H:%M:%S'),
-                'Path': filepath
-            })
+    with os.scandir(logs_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(('.log', '.jsonl')) and entry.is_file():
+                entry_stat = entry.stat()
+                log_files.append({
+                    'Filename': entry.name,
+                    'Size': f"{entry_stat.st_size / 1024:.1f} KB",
+                    'Last Modified': datetime.fromtimestamp(entry_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+                    'Path': entry.path
+                })
     
     if not log_files:
         st.info("No log files found.")
@@ -224,10 +252,8 @@ def display_log_analysis():
         
         try:
             with open(selected_path, 'r') as f:
-                # Read last 100 lines
-                lines = f.readlines()
-                recent_lines = lines[-100:] if len(lines) > 100 else lines
-                content = ''.join(recent_lines)
+                # Keep only the last 100 lines while streaming through the file
+                content = ''.join(deque(f, maxlen=100))
             
             st.text_area("Log Content (Last 100 lines):", content, height=300)
             
@@ -245,10 +271,10 @@ def export_metrics():
                            format_func=lambda x: f"{x} hours" if x < 24 else f"{x//24} days")
     
     with col2:
-        if st.button("Export Metrics to JSON"):
+        if st.button("Export Metrics to NDJSON"):
             try:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                export_path = f"exports/metrics_export_{timestamp}.json"
+                export_path = f"exports/metrics_export_{timestamp}.jsonl"
                 
                 os.makedirs("exports", exist_ok=True)
                 performance_monitor.export_metrics(export_path, hours=hours)
@@ -261,7 +287,7 @@ def export_metrics():
                         label="Download Export File",
                         data=f.read(),
                         file_name=os.path.basename(export_path),
-                        mime="application/json"
+                        mime="application/x-ndjson"
                     )
                     
             except Exception as e:
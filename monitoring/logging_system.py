@@ -8,11 +8,70 @@ import logging
 import json
 import os
 import sys
-from datetime import datetime
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Union
 from enum import Enum
 import threading
-from logging.handlers import RotatingFileHandler
+import atexit
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Standard level names mapped once, instead of getattr(logging, ...) per call
+_LEVEL_MAP = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL
+}
+
+# JSONL serializer picked once at import; default=str keeps records with
+# non-JSON extras (paths, exceptions, ...) instead of failing the whole line
+if orjson:
+    def _dumps_log_entry(log_entry: Dict[str, Any]) -> str:
+        return orjson.dumps(log_entry, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+else:
+    def _dumps_log_entry(log_entry: Dict[str, Any]) -> str:
+        return json.dumps(log_entry, default=str, separators=(',', ':'))
+
+def _has_extra_data(record: logging.LogRecord) -> bool:
+    """Filter for the JSONL handler: plain INFO/DEBUG records are already in the text log,
+    warnings and errors are always kept"""
+    return hasattr(record, 'extra_data') or record.levelno >= logging.WARNING
+
+# Background listeners writing each logger's records, keyed by logger name
+_listeners = {}
+_listeners_lock = threading.Lock()
+
+def _stop_listener(listener: QueueListener):
+    """Stop a listener, tolerating one that was already stopped"""
+    if listener._thread is not None:
+        listener.stop()
+
+def _start_listener(name: str, listener: QueueListener):
+    """Start a logger's listener, stopping any previous one for the same name"""
+    with _listeners_lock:
+        previous = _listeners.pop(name, None)
+        _listeners[name] = listener
+    if previous:
+        _stop_listener(previous)
+        for handler in previous.handlers:
+            handler.close()
+    listener.start()
+
+@atexit.register
+def _stop_listeners():
+    """Drain queued records to the handlers before the interpreter exits"""
+    with _listeners_lock:
+        listeners = list(_listeners.values())
+        _listeners.clear()
+    for listener in listeners:
+        _stop_listener(listener)
 
 class LogLevel(Enum):
     """Enhanced log levels with custom categories"""
@@ -25,6 +84,84 @@ class LogLevel(Enum):
     PERFORMANCE = "PERFORMANCE"
     BUSINESS = "BUSINESS"
 
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that writes through a buffer and flushes in batches
+    
+    A write flushes when it completes a batch of `batch_size` records, when it
+    arrives `flush_interval` seconds or more after the last flush, or when the
+    record is at or above `flush_level`. The interval is only checked as
+    records arrive; nothing flushes an idle handler by itself, so its owner
+    must call flush() when it goes quiet (StructuredLogger's listener does
+    this whenever its queue runs empty).
+    
+    Records are written into a large in-process buffer and the file size is
+    tracked in memory, so a record costs no stat/seek syscalls and is formatted
+    once (RotatingFileHandler.shouldRollover stats the path, seeks the stream,
+    which flushes it, and formats every record twice). Sizes are counted in
+    characters, so rotation is approximate for non-ASCII text. Errors are
+    flushed at once so a failure is on disk even if the process dies next.
+    Explicit flush() and close() always flush.
+    """
+    
+    def __init__(self, *args, batch_size: int = 64, flush_interval: float = 1.0,
+                 buffer_size: int = 1024 * 1024, flush_level: int = logging.ERROR, **kwargs):
+        # Set before super().__init__, which opens the stream
+        self.buffer_size = buffer_size
+        self._size = 0
+        super().__init__(*args, **kwargs)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self._pending = 0
+        self._last_flush = time.monotonic()
+    
+    def _open(self):
+        stream = self._builtin_open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                                    encoding=self.encoding, errors=self.errors)
+        # Append mode starts at the end of the file, so this is its current size
+        self._size = stream.tell()
+        return stream
+    
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size and self._size + len(msg) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._size += len(msg)
+            
+            self._pending += 1
+            if (record.levelno >= self.flush_level
+                    or self._pending >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        super().flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+class _FlushingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers each time the queue runs empty
+    
+    Buffered records therefore reach the files as soon as the logger goes
+    idle instead of waiting for the next batch.
+    """
+    
+    def dequeue(self, block):
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+        return self.queue.get(block)
+
 class StructuredLogger:
     """Enhanced logger with structured output and multiple handlers"""
     
@@ -34,21 +171,53 @@ class StructuredLogger:
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.DEBUG)
         
-        # Ensure log directory exists
-        os.makedirs(log_dir, exist_ok=True)
+        # Ensure log directory exists (a single stat when it already does)
+        if not os.path.isdir(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
+        # Common path prefix for this logger's files
+        self._path_prefix = os.path.join(log_dir, name)
         
         # Remove existing handlers to avoid duplicates
         self.logger.handlers.clear()
         
         # Setup handlers
+        self._handlers = []
         self._setup_console_handler()
         self._setup_file_handler()
         self._setup_json_handler()
         self._setup_error_handler()
         
+        # Callers only enqueue records; formatting and file I/O run on a listener thread
+        self._queue = queue.SimpleQueue()
+        self.logger.addHandler(QueueHandler(self._queue))
+        self._listener = _FlushingQueueListener(self._queue, *self._handlers, respect_handler_level=True)
+        _start_listener(name, self._listener)
+        self._flush_lock = threading.Lock()
+        
         # Thread-local context
         self._context = threading.local()
     
+    def flush(self):
+        """Write every record queued so far through to the files"""
+        with self._flush_lock:
+            if self._listener._thread is None:
+                return  # Closed
+            # Stopping the listener drains the queue; a fresh thread then takes over
+            _stop_listener(self._listener)
+            for handler in self._handlers:
+                handler.flush()
+            self._listener.start()
+    
+    def close(self):
+        """Drain queued records to the files and close this logger's handlers"""
+        with _listeners_lock:
+            if _listeners.get(self.name) is self._listener:
+                del _listeners[self.name]
+        with self._flush_lock:
+            _stop_listener(self._listener)
+            for handler in self._handlers:
+                handler.close()
+    
     def _setup_console_handler(self):
         """Setup colorized console handler"""
         console_handler = logging.StreamHandler(sys.stdout)
@@ -69,6 +238,8 @@ class StructuredLogger:
             }
             
             def format(self, record):
+                # Color a copy: the file and JSONL handlers format the same record afterwards
+                record = logging.makeLogRecord(record.__dict__)
                 log_color = self.COLORS.get(record.levelname, '')
                 record.levelname = f"{log_color}{record.levelname}{self.COLORS['ENDC']}"
                 return super().format(record)
@@ -78,12 +249,12 @@ class StructuredLogger:
             datefmt='%H:%M:%S'
         )
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        self._handlers.append(console_handler)
     
     def _setup_file_handler(self):
         """Setup rotating file handler for general logs"""
-        file_path = os.path.join(self.log_dir, f"{self.name}.log")
-        file_handler = RotatingFileHandler(
+        file_path = f"{self._path_prefix}.log"
+        file_handler = BatchedRotatingFileHandler(
             file_path, maxBytes=10*1024*1024, backupCount=5  # 10MB files, 5 backups
         )
         file_handler.setLevel(logging.DEBUG)
@@ -92,20 +263,22 @@ class StructuredLogger:
             '%(asctime)s | %(name)s | %(levelname)s | %(funcName)s:%(lineno)d | %(message)s'
         )
         file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        self._handlers.append(file_handler)
     
     def _setup_json_handler(self):
         """Setup JSON structured log handler"""
-        json_path = os.path.join(self.log_dir, f"{self.name}_structured.jsonl")
-        json_handler = RotatingFileHandler(
+        json_path = f"{self._path_prefix}_structured.jsonl"
+        json_handler = BatchedRotatingFileHandler(
             json_path, maxBytes=10*1024*1024, backupCount=5
         )
         json_handler.setLevel(logging.DEBUG)
         
         class JSONFormatter(logging.Formatter):
             def format(self, record):
-                log_entry = {
-                    'timestamp': datetime.fromtimestamp(record.created).isoformat(),
+                # One dict literal with the extra context (if any) unpacked in place
+                return _dumps_log_entry({
+                    # Epoch nanoseconds; readers convert only when displaying
+                    'timestamp_ns': int(record.created * 1_000_000_000),
                     'logger': record.name,
                     'level': record.levelname,
                     'message': record.getMessage(),
@@ -113,21 +286,17 @@ class StructuredLogger:
                     'function': record.funcName,
                     'line': record.lineno,
                     'thread_id': record.thread,
-                    'process_id': record.process
-                }
-                
-                # Add extra context if available
-                if hasattr(record, 'extra_data'):
-                    log_entry.update(record.extra_data)
-                
-                return json.dumps(log_entry)
+                    'process_id': record.process,
+                    **getattr(record, 'extra_data', {})
+                })
         
         json_handler.setFormatter(JSONFormatter())
-        self.logger.addHandler(json_handler)
+        json_handler.addFilter(_has_extra_data)
+        self._handlers.append(json_handler)
     
     def _setup_error_handler(self):
         """Setup dedicated error log handler"""
-        error_path = os.path.join(self.log_dir, f"{self.name}_errors.log")
+        error_path = f"{self._path_prefix}_errors.log"
         error_handler = RotatingFileHandler(
             error_path, maxBytes=5*1024*1024, backupCount=3
         )
@@ -138,7 +307,7 @@ class StructuredLogger:
             'Exception: %(exc_info)s\n' + '-'*80
         )
         error_handler.setFormatter(formatter)
-        self.logger.addHandler(error_handler)
+        self._handlers.append(error_handler)
     
     def set_context(self, **context):
         """Set thread-local context for logging"""
@@ -157,67 +326,83 @@ class StructuredLogger:
             return self._context.data.copy()
         return {}
     
-    def _log(self, level: str, message: str, extra_data: Dict[str, Any] = None):
+    def _log(self, level: Union[int, str], message: str, extra_data: Dict[str, Any] = None):
         """Internal logging method with context"""
-        # Merge context with extra data
-        context = self._get_context()
+        # Map custom levels to standard levels
+        log_level = level if isinstance(level, int) else _LEVEL_MAP.get(level, logging.INFO)
+        
+        # Skip context merging entirely for filtered-out levels
+        if not self.logger.isEnabledFor(log_level):
+            return
+        
+        # Merge context with extra data. The record is formatted later on the listener
+        # thread, so thread-local context is snapshotted; the per-call kwargs dict is
+        # already private and is used as-is when there is no context.
+        context = getattr(self._context, 'data', None)
         if extra_data:
-            context.update(extra_data)
+            context = {**context, **extra_data} if context else extra_data
+        elif context:
+            context = context.copy()
         
         # Create log record with extra data
-        extra = {'extra_data': context} if context else {}
-        
-        # Map custom levels to standard levels
-        log_level = getattr(logging, level.upper(), logging.INFO)
-        self.logger.log(log_level, message, extra=extra)
+        self.logger.log(log_level, message, extra={'extra_data': context} if context else None)
     
     def debug(self, message: str, **extra):
         """Debug level logging"""
-        self._log('DEBUG', message, extra)
+        self._log(logging.DEBUG, message, extra)
     
     def info(self, message: str, **extra):
         """Info level logging"""
-        self._log('INFO', message, extra)
+        self._log(logging.INFO, message, extra)
     
     def warning(self, message: str, **extra):
         """Warning level logging"""
-        self._log('WARNING', message, extra)
+        self._log(logging.WARNING, message, extra)
     
     def error(self, message: str, **extra):
         """Error level logging"""
-        self._log('ERROR', message, extra)
+        self._log(logging.ERROR, message, extra)
     
     def critical(self, message: str, **extra):
         """Critical level logging"""
-        self._log('CRITICAL', message, extra)
+        self._log(logging.CRITICAL, message, extra)
     
     def success(self, message: str, **extra):
         """Success level logging (custom)"""
-        self._log('INFO', f"✅ SUCCESS: {message}", extra)
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self._log(logging.INFO, f"✅ SUCCESS: {message}", extra)
     
     def performance(self, message: str, duration: float = None, **extra):
         """Performance level logging (custom)"""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         if duration is not None:
             extra['duration'] = duration
             message = f"⏱️  PERFORMANCE: {message} (duration: {duration:.3f}s)"
         else:
             message = f"⏱️  PERFORMANCE: {message}"
-        self._log('INFO', message, extra)
+        self._log(logging.INFO, message, extra)
     
     def business(self, message: str, **extra):
         """Business logic level logging (custom)"""
-        self._log('INFO', f"💼 BUSINESS: {message}", extra)
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self._log(logging.INFO, f"💼 BUSINESS: {message}", extra)
 
 # Logger factory
 _loggers = {}
 _lock = threading.Lock()
 
 def get_logger(name: str) -> StructuredLogger:
-    """Get or create logger instance"""
-    with _lock:
-        if name not in _loggers:
-            _loggers[name] = StructuredLogger(name)
-        return _loggers[name]
+    """Get or create logger instance (created once per name, even under concurrent first use)"""
+    logger = _loggers.get(name)
+    if logger is None:
+        with _lock:
+            logger = _loggers.get(name)
+            if logger is None:
+                logger = _loggers[name] = StructuredLogger(name)
+    return logger
 
 # Convenience loggers for main components
 def get_main_logger() -> StructuredLogger:
@@ -257,6 +442,10 @@ class LogContext:
         self.logger.clear_context()
         if self.previous_context:
             self.logger.set_context(**self.previous_context)
+        # An exception is leaving the context: make its log records durable before
+        # the caller's handler runs
+        if exc_type is not None:
+            self.logger.flush()
 
 def log_operation(logger_name: str, operation: str):
     """Decorator for logging operation start/end"""
@@ -266,15 +455,15 @@ def log_operation(logger_name: str, operation: str):
             
             with LogContext(logger, operation=operation, function=func.__name__):
                 logger.info(f"Starting {operation}")
-                start_time = datetime.now()
+                start_ns = time.perf_counter_ns()
                 
                 try:
                     result = func(*args, **kwargs)
-                    duration = (datetime.now() - start_time).total_seconds()
+                    duration = (time.perf_counter_ns() - start_ns) / 1e9
                     logger.success(f"Completed {operation}", duration=duration)
                     return result
                 except Exception as e:
-                    duration = (datetime.now() - start_time).total_seconds()
+                    duration = (time.perf_counter_ns() - start_ns) / 1e9
                     logger.error(f"Failed {operation}: {e}", 
                                duration=duration, error_type=type(e).__name__)
                     raise
@@ -7,13 +7,21 @@ Tracks system performance, success rates, and provides detailed analytics
 import time
 import json
 import os
+import sys
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Any, Optional
+from dataclasses import dataclass
 import threading
-from collections import defaultdict, deque
+from collections import deque
 
-@dataclass
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@dataclass(slots=True)
 class MetricPoint:
     """Individual metric data point"""
     timestamp: float
@@ -23,7 +31,7 @@ class MetricPoint:
     success: bool
     metadata: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True)
 class PerformanceStats:
     """Performance statistics for a specific operation"""
     total_operations: int
@@ -36,15 +44,144 @@ class PerformanceStats:
     last_24h_operations: int
     last_24h_success_rate: float
 
+def _json_line(obj: Dict[str, Any]) -> bytes:
+    """Serialize one NDJSON line (orjson when available)"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+    return (json.dumps(obj) + '\n').encode('utf-8')
+
+class MetricsHistory:
+    """Fixed-size ring buffer of metrics stored as parallel numpy columns
+    
+    Timestamps, durations and success flags live in numpy arrays so that
+    statistics are computed with vectorized masks instead of per-object
+    attribute access. Agent/operation pairs are interned to integer ids and
+    metadata dicts are kept in a parallel list. Indexing and iteration
+    rebuild MetricPoint rows, so the buffer still behaves like the deque it
+    replaces.
+    """
+    
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._timestamp = np.empty(maxlen, dtype=np.float64)
+        self._duration = np.empty(maxlen, dtype=np.float64)
+        self._success = np.zeros(maxlen, dtype=np.bool_)
+        self._key_id = np.empty(maxlen, dtype=np.int32)
+        self._metadata = [None] * maxlen
+        self._keys = []  # key id -> (agent, operation)
+        self._key_ids = {}  # (agent, operation) -> key id
+        self._head = 0  # next write position
+        self._size = 0
+    
+    def key_id(self, agent: str, operation: str) -> int:
+        """Return the interned id for an agent/operation pair"""
+        pair = (agent, operation)
+        key_id = self._key_ids.get(pair)
+        if key_id is None:
+            # Rows rebuilt from the buffer share these interned strings
+            pair = (sys.intern(agent), sys.intern(operation))
+            key_id = self._key_ids[pair] = len(self._keys)
+            self._keys.append(pair)
+        return key_id
+    
+    def key(self, key_id: int) -> tuple:
+        """Return the (agent, operation) pair for an interned id"""
+        return self._keys[key_id]
+    
+    @property
+    def keys(self) -> List[tuple]:
+        return self._keys
+    
+    def append(self, metric: MetricPoint):
+        head = self._head
+        self._timestamp[head] = metric.timestamp
+        self._duration[head] = metric.duration
+        self._success[head] = metric.success
+        self._key_id[head] = self.key_id(metric.agent, metric.operation)
+        self._metadata[head] = metric.metadata
+        self._head = (head + 1) % self.maxlen
+        if self._size < self.maxlen:
+            self._size += 1
+    
+    def extend(self, metrics):
+        for metric in metrics:
+            self.append(metric)
+    
+    def metadata_column(self) -> list:
+        """The metadata dicts, oldest first (references, not copies)"""
+        if self._size < self.maxlen:
+            return self._metadata[:self._size]
+        return self._metadata[self._head:] + self._metadata[:self._head]
+    
+    def clear(self):
+        self._metadata = [None] * self.maxlen
+        self._keys = []
+        self._key_ids = {}
+        self._head = 0
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _positions(self) -> np.ndarray:
+        """Buffer positions of the stored metrics, oldest first"""
+        return (np.arange(self._size) + (self._head - self._size)) % self.maxlen
+    
+    def columns(self) -> tuple:
+        """Copies of the (timestamp, duration, success, key_id) columns, oldest first"""
+        if self._size < self.maxlen:
+            # Not wrapped yet: the data is already in order
+            end = self._size
+            return (self._timestamp[:end].copy(), self._duration[:end].copy(),
+                    self._success[:end].copy(), self._key_id[:end].copy())
+        positions = self._positions()
+        return (self._timestamp[positions], self._duration[positions],
+                self._success[positions], self._key_id[positions])
+    
+    def metric_at(self, index: int) -> MetricPoint:
+        """Rebuild the MetricPoint at chronological index (0 = oldest)"""
+        position = (self._head - self._size + index) % self.maxlen
+        agent, operation = self._keys[self._key_id[position]]
+        return MetricPoint(
+            timestamp=float(self._timestamp[position]),
+            agent=agent,
+            operation=operation,
+            duration=float(self._duration[position]),
+            success=bool(self._success[position]),
+            metadata=self._metadata[position]
+        )
+    
+    def __getitem__(self, index: int) -> MetricPoint:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("metrics history index out of range")
+        return self.metric_at(index)
+    
+    def __iter__(self):
+        for index in range(self._size):
+            yield self.metric_at(index)
+    
+    def __reversed__(self):
+        for index in range(self._size - 1, -1, -1):
+            yield self.metric_at(index)
+
 class PerformanceMonitor:
     """Central performance monitoring system"""
     
     def __init__(self, max_history_points=10000):
         self.max_history_points = max_history_points
-        self.metrics_history = deque(maxlen=max_history_points)
-        self.active_operations = {}  # Track ongoing operations
+        self.metrics_history = MetricsHistory(max_history_points)
+        # Track ongoing operations; single dict set/pop calls are atomic, so no lock is needed
+        self.active_operations = {}
+        # Guards only the metrics_history ring buffer (its columns are written together)
         self.lock = threading.Lock()
         
+        # Rolling success window of the last 10 operations per (agent, operation)
+        self._recent_by_key = {}
+        # Matching performance_thresholds key (or None) per (agent, operation)
+        self._threshold_key_by_pair = {}
+        
         # Performance thresholds
         self.performance_thresholds = {
             'image_sourcing': {
@@ -65,49 +202,62 @@ class PerformanceMonitor:
             }
         }
     
+    def reset(self):
+        """Drop all recorded metrics, in-flight operations and cached per-operation state"""
+        with self.lock:
+            self.metrics_history.clear()
+        self.active_operations.clear()
+        self._recent_by_key.clear()
+        self._threshold_key_by_pair.clear()
+    
     def start_operation(self, agent: str, operation: str, metadata: Dict[str, Any] = None) -> str:
         """Start monitoring an operation and return operation ID"""
         operation_id = f"{agent}_{operation}_{time.time()}_{id(threading.current_thread())}"
         
-        with self.lock:
-            self.active_operations[operation_id] = {
-                'agent': agent,
-                'operation': operation,
-                'start_time': time.time(),
-                'metadata': metadata or {}
-            }
+        # The metadata dict is kept by reference so updates made during the operation are recorded
+        self.active_operations[operation_id] = {
+            'agent': agent,
+            'operation': operation,
+            'start_time': time.time(),
+            'metadata': metadata if metadata is not None else {}
+        }
         
         return operation_id
     
-    def end_operation(self, operation_id: str, success: bool, metadata: Dict[str, Any] = None):
-        """End monitoring an operation and record metrics"""
-        with self.lock:
-            if operation_id not in self.active_operations:
-                return
-            
-            op_data = self.active_operations.pop(operation_id)
-            end_time = time.time()
+    def end_operation(self, operation_id: str, success: bool, metadata: Dict[str, Any] = None,
+                      duration: float = None):
+        """End monitoring an operation and record metrics
+        
+        duration overrides the wall-clock time since start_operation, for callers
+        that time the operation themselves.
+        """
+        op_data = self.active_operations.pop(operation_id, None)
+        if op_data is None:
+            return
+        
+        end_time = time.time()
+        if duration is None:
             duration = end_time - op_data['start_time']
-            
-            # Merge metadata
-            final_metadata = op_data['metadata'].copy()
-            if metadata:
-                final_metadata.update(metadata)
-            
-            # Create metric point
-            metric = MetricPoint(
-                timestamp=end_time,
-                agent=op_data['agent'],
-                operation=op_data['operation'],
-                duration=duration,
-                success=success,
-                metadata=final_metadata
-            )
-            
+        
+        # Copy at record time so later changes to the caller's dict don't rewrite history
+        final_metadata = {**op_data['metadata'], **(metadata or {})}
+        
+        # Create metric point
+        metric = MetricPoint(
+            timestamp=end_time,
+            agent=op_data['agent'],
+            operation=op_data['operation'],
+            duration=duration,
+            success=success,
+            metadata=final_metadata
+        )
+        
+        with self.lock:
             self.metrics_history.append(metric)
-            
-            # Check for performance alerts
-            self._check_performance_alert(metric)
+        self._record_recent(metric)
+        
+        # Check for performance alerts
+        self._check_performance_alert(metric)
     
     def record_instant_metric(self, agent: str, operation: str, success: bool, 
                             duration: float, metadata: Dict[str, Any] = None):
@@ -118,63 +268,136 @@ class PerformanceMonitor:
             operation=operation,
             duration=duration,
             success=success,
-            metadata=metadata or {}
+            metadata=dict(metadata) if metadata else {}
         )
         
         with self.lock:
             self.metrics_history.append(metric)
+        self._record_recent(metric)
+        
+        self._check_performance_alert(metric)
+    
+    def record_many(self, agent: str, timings: List[tuple], metadata: Dict[str, Any] = None):
+        """Record several operations timed inline with time.perf_counter.
+        
+        Each timing is (operation, start, end, error) with error None on success,
+        optionally followed by a metadata dict for that step alone, which is
+        merged over the shared `metadata`. All metrics are appended under a
+        single lock acquisition.
+        """
+        if not timings:
+            return
+        
+        # Map perf_counter readings onto wall-clock timestamps
+        wall_offset = time.time() - time.perf_counter()
+        shared_metadata = metadata or {}
+        metrics = []
+        for operation, start, end, error, *step_metadata in timings:
+            # Each metric gets its own copy of the metadata
+            metric_metadata = dict(shared_metadata)
+            if step_metadata and step_metadata[0]:
+                metric_metadata.update(step_metadata[0])
+            if error:
+                metric_metadata['error'] = error
+            metrics.append(MetricPoint(
+                timestamp=end + wall_offset,
+                agent=agent,
+                operation=operation,
+                duration=end - start,
+                success=error is None,
+                metadata=metric_metadata
+            ))
+        
+        with self.lock:
+            self.metrics_history.extend(metrics)
+        
+        for metric in metrics:
+            self._record_recent(metric)
             self._check_performance_alert(metric)
     
+    def _snapshot(self, cutoff_time: float, agent: str = None, operation: str = None) -> tuple:
+        """Copy the metric columns at or after cutoff_time matching the agent/operation filters"""
+        with self.lock:
+            timestamp, duration, success, key_id = self.metrics_history.columns()
+            keys = list(self.metrics_history.keys)
+        
+        mask = timestamp >= cutoff_time
+        if agent or operation:
+            allowed = [i for i, (key_agent, key_operation) in enumerate(keys)
+                       if (not agent or key_agent == agent)
+                       and (not operation or key_operation == operation)]
+            mask &= np.isin(key_id, allowed)
+        
+        return timestamp[mask], duration[mask], success[mask], key_id[mask], keys
+    
     def get_performance_stats(self, agent: str = None, operation: str = None, 
                             hours: int = 24) -> Dict[str, PerformanceStats]:
         """Get performance statistics for specified criteria"""
         cutoff_time = time.time() - (hours * 3600)
+        return self._calculate_stats(*self._snapshot(cutoff_time, agent, operation))
+    
+    def get_performance_stats_multi(self, windows: List[int] = (1, 6, 24, 168), agent: str = None,
+                                    operation: str = None) -> Dict[int, Dict[str, PerformanceStats]]:
+        """Get performance statistics for several time windows (in hours) with one history scan"""
+        now = time.time()
+        cutoffs = [(hours, now - (hours * 3600)) for hours in windows]
+        oldest_cutoff = min(cutoff for _, cutoff in cutoffs)
+        
+        timestamp, duration, success, key_id, keys = self._snapshot(oldest_cutoff, agent, operation)
+        
+        stats_by_window = {}
+        for hours, cutoff in cutoffs:
+            window = timestamp >= cutoff
+            stats_by_window[hours] = self._calculate_stats(
+                timestamp[window], duration[window], success[window], key_id[window], keys
+            )
+        return stats_by_window
+    
+    def _calculate_stats(self, timestamp: np.ndarray, duration: np.ndarray, success: np.ndarray,
+                         key_id: np.ndarray, keys: List[tuple]) -> Dict[str, PerformanceStats]:
+        """Calculate performance statistics grouped by agent_operation from metric columns"""
+        if not len(timestamp):
+            return {}
+        
+        # Map interned pairs onto agent_operation names (distinct pairs can share a name)
+        names = list(dict.fromkeys(f"{agent}_{operation}" for agent, operation in keys))
+        name_index = {name: i for i, name in enumerate(names)}
+        pair_to_group = np.array([name_index[f"{agent}_{operation}"] for agent, operation in keys],
+                                 dtype=np.intp)
+        group = pair_to_group[key_id]
+        
+        # Sort once by group; every aggregate is then a segmented reduction over contiguous runs
+        order = np.argsort(group, kind='stable')
+        group = group[order]
+        duration = duration[order]
+        success = success[order].astype(np.int64)
+        last_24h = (timestamp[order] >= time.time() - (24 * 3600)).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        
+        totals = np.diff(np.r_[starts, len(group)]).tolist()
+        successes = np.add.reduceat(success, starts).tolist()
+        duration_sums = np.add.reduceat(duration, starts).tolist()
+        min_durations = np.minimum.reduceat(duration, starts).tolist()
+        max_durations = np.maximum.reduceat(duration, starts).tolist()
+        last_24h_totals = np.add.reduceat(last_24h, starts).tolist()
+        last_24h_successes = np.add.reduceat(last_24h & success, starts).tolist()
         
-        with self.lock:
-            # Filter metrics
-            filtered_metrics = []
-            for metric in self.metrics_history:
-                if metric.timestamp >= cutoff_time:
-                    if agent and metric.agent != agent:
-                        continue
-                    if operation and metric.operation != operation:
-                        continue
-                    filtered_metrics.append(metric)
-        
-        # Group by agent_operation
-        grouped_metrics = defaultdict(list)
-        for metric in filtered_metrics:
-            key = f"{metric.agent}_{metric.operation}"
-            grouped_metrics[key].append(metric)
-        
-        # Calculate stats
         stats = {}
-        for key, metrics in grouped_metrics.items():
-            if not metrics:
-                continue
-                
-            total_ops = len(metrics)
-            successful_ops = sum(1 for m in metrics if m.success)
-            failed_ops = total_ops - successful_ops
-            durations = [m.duration for m in metrics]
-            
-            # Last 24h stats
-            last_24h_cutoff = time.time() - (24 * 3600)
-            last_24h_metrics = [m for m in metrics if m.timestamp >= last_24h_cutoff]
-            last_24h_ops = len(last_24h_metrics)
-            last_24h_successful = sum(1 for m in last_24h_metrics if m.success)
-            last_24h_success_rate = last_24h_successful / last_24h_ops if last_24h_ops > 0 else 0
+        for i, group_index in enumerate(group[starts].tolist()):
+            total_ops = totals[i]
+            successful_ops = successes[i]
+            last_24h_ops = last_24h_totals[i]
             
-            stats[key] = PerformanceStats(
+            stats[names[group_index]] = PerformanceStats(
                 total_operations=total_ops,
                 successful_operations=successful_ops,
-                failed_operations=failed_ops,
-                average_duration=sum(durations) / len(durations),
-                min_duration=min(durations),
-                max_duration=max(durations),
+                failed_operations=total_ops - successful_ops,
+                average_duration=duration_sums[i] / total_ops,
+                min_duration=min_durations[i],
+                max_duration=max_durations[i],
                 success_rate=successful_ops / total_ops,
                 last_24h_operations=last_24h_ops,
-                last_24h_success_rate=last_24h_success_rate
+                last_24h_success_rate=last_24h_successes[i] / last_24h_ops if last_24h_ops > 0 else 0
             )
         
         return stats
@@ -184,48 +407,77 @@ class PerformanceMonitor:
         cutoff_time = time.time() - (hours * 3600)
         
         with self.lock:
-            failures = []
-            for metric in reversed(self.metrics_history):
-                if metric.timestamp < cutoff_time:
-                    break
-                if not metric.success:
-                    failures.append(metric)
-                if len(failures) >= limit:
-                    break
-        
-        return failures
+            timestamp, _, success, _ = self.metrics_history.columns()
+            failed = np.flatnonzero((timestamp >= cutoff_time) & ~success)
+            # Most recent first
+            return [self.metrics_history.metric_at(int(index)) for index in failed[::-1][:limit]]
     
     def export_metrics(self, filepath: str, hours: int = 24):
-        """Export metrics to JSON file"""
+        """Export metrics to an NDJSON file
+        
+        The first line is a header object (export_time, time_range_hours,
+        total_metrics); each following line is one metric. Rows are streamed
+        from a column snapshot, so no per-metric dict list is built up front.
+        """
         cutoff_time = time.time() - (hours * 3600)
         
         with self.lock:
-            filtered_metrics = [
-                asdict(metric) for metric in self.metrics_history
-                if metric.timestamp >= cutoff_time
-            ]
+            timestamp, duration, success, key_id = self.metrics_history.columns()
+            metadata = self.metrics_history.metadata_column()
+            keys = list(self.metrics_history.keys)
         
-        export_data = {
+        selected = np.flatnonzero(timestamp >= cutoff_time)
+        header = {
             'export_time': datetime.now().isoformat(),
             'time_range_hours': hours,
-            'total_metrics': len(filtered_metrics),
-            'metrics': filtered_metrics
+            'total_metrics': len(selected)
         }
         
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filepath, 'wb') as f:
+            f.write(_json_line(header))
+            for index, ts, dur, ok, pair_id in zip(
+                selected.tolist(), timestamp[selected].tolist(), duration[selected].tolist(),
+                success[selected].tolist(), key_id[selected].tolist()
+            ):
+                agent, operation = keys[pair_id]
+                f.write(_json_line({
+                    'timestamp': ts,
+                    'agent': agent,
+                    'operation': operation,
+                    'duration': dur,
+                    'success': ok,
+                    'metadata': metadata[index]
+                }))
     
-    def _check_performance_alert(self, metric: MetricPoint):
-        """Check if metric triggers performance alert"""
-        operation_key = f"{metric.agent}_{metric.operation}".lower()
+    def _record_recent(self, metric: MetricPoint):
+        """Push a result into its key's rolling window
         
-        # Find matching threshold
-        threshold_key = None
+        dict.setdefault and deque.append are atomic, so writers never block each other here.
+        """
+        key = (metric.agent, metric.operation)
+        recent = self._recent_by_key.get(key)
+        if recent is None:
+            recent = self._recent_by_key.setdefault(key, deque(maxlen=10))
+        recent.append(metric.success)
+    
+    def _match_threshold_key(self, agent: str, operation: str) -> Optional[str]:
+        """Find the performance_thresholds key contained in agent_operation, if any"""
+        operation_key = f"{agent}_{operation}".lower()
         for key in self.performance_thresholds:
             if key in operation_key:
-                threshold_key = key
-                break
+                return key
+        return None
+    
+    def _check_performance_alert(self, metric: MetricPoint):
+        """Check if metric triggers performance alert"""
+        pair = (metric.agent, metric.operation)
+        try:
+            threshold_key = self._threshold_key_by_pair[pair]
+        except KeyError:
+            threshold_key = self._threshold_key_by_pair.setdefault(pair, self._match_threshold_key(*pair))
         
         if not threshold_key:
             return
@@ -238,16 +490,11 @@ class PerformanceMonitor:
             alerts.append(f"Duration {metric.duration:.2f}s exceeds threshold {thresholds['max_duration']}s")
         
         # Success rate alert (check last 10 operations)
-        recent_ops = []
-        with self.lock:
-            for m in reversed(self.metrics_history):
-                if m.agent == metric.agent and m.operation == metric.operation:
-                    recent_ops.append(m)
-                    if len(recent_ops) >= 10:
-                        break
-        
-        if len(recent_ops) >= 5:  # Only check if we have enough data
-            recent_success_rate = sum(1 for m in recent_ops if m.success) / len(recent_ops)
+        recent = self._recent_by_key.get(pair, ())
+        recent_ops = len(recent)
+        
+        if recent_ops >= 5:  # Only check if we have enough data
+            recent_success_rate = sum(recent) / recent_ops
             if recent_success_rate < thresholds['min_success_rate']:
                 alerts.append(f"Success rate {recent_success_rate:.2%} below threshold {thresholds['min_success_rate']:.2%}")
         
@@ -258,31 +505,42 @@ class PerformanceMonitor:
 # Global performance monitor instance
 performance_monitor = PerformanceMonitor()
 
+def get_performance_monitor() -> PerformanceMonitor:
+    """Return the current global monitor (resolved per call, so tests can swap it)"""
+    return performance_monitor
+
 class OperationTimer:
-    """Context manager for timing operations"""
+    """Context manager for timing operations
+    
+    The duration is measured with time_source (a monotonic clock by default);
+    tests can pass a fake clock and advance it instead of sleeping.
+    """
     
-    def __init__(self, agent: str, operation: str, metadata: Dict[str, Any] = None):
+    def __init__(self, agent: str, operation: str, metadata: Dict[str, Any] = None,
+                 time_source: Callable[[], float] = time.perf_counter):
         self.agent = agent
         self.operation = operation
         self.metadata = metadata or {}
+        self.time_source = time_source
         self.operation_id = None
         self.success = False
+        self._start = None
     
     def __enter__(self):
         self.operation_id = performance_monitor.start_operation(
             self.agent, self.operation, self.metadata
         )
+        self._start = self.time_source()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.success = exc_type is None
-        end_metadata = self.metadata.copy()
-        if exc_val:
-            end_metadata['error'] = str(exc_val)
+        # self.metadata is already attached to the operation; only the error needs merging
         performance_monitor.end_operation(
             self.operation_id, 
             self.success,
-            end_metadata
+            {'error': str(exc_val)} if exc_val else None,
+            duration=self.time_source() - self._start
         )
     
     def set_metadata(self, key: str, value: Any):
@@ -301,7 +559,8 @@ def monitor_operation(agent: str, operation: str, metadata: Dict[str, Any] = Non
     """Decorator for monitoring function performance"""
     def decorator(func):
         def wrapper(*args, **kwargs):
-            with OperationTimer(agent, operation, metadata) as timer:
+            # Per-call copy so set_metadata never leaks into the decorator's shared dict
+            with OperationTimer(agent, operation, dict(metadata) if metadata else None) as timer:
                 try:
                     result = func(*args, **kwargs)
                     timer.mark_success()
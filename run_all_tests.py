@@ -8,6 +8,7 @@ import unittest
 import sys
 import os
 import time
+import importlib
 from io import StringIO
 
 def run_test_suite():
@@ -20,73 +21,62 @@ def run_test_suite():
     test_modules = [
         'test_vehicle_parsing_fix',
         'test_enhanced_image_validation', 
+        'test_core_functionality',
         'test_monitoring_system',
         'test_complete_system'
     ]
     
-    all_results = []
-    total_tests = 0
-    total_failures = 0
-    total_errors = 0
-    
     start_time = time.time()
     
+    # Load every module through one loader and run them as a single suite
+    loader = unittest.TestLoader()
+    module_suites = {}
     for module in test_modules:
-        print(f"\n🔍 Running tests from {module}")
-        print("-" * 40)
-        
         try:
-            # Import the test module
-            test_module = __import__(module)
-            
-            # Create test suite
-            loader = unittest.TestLoader()
-            suite = loader.loadTestsFromModule(test_module)
-            
-            # Run tests with detailed output
-            stream = StringIO()
-            runner = unittest.TextTestRunner(
-                stream=stream, 
-                verbosity=2,
-                buffer=True,
-                failfast=False
-            )
-            
-            result = runner.run(suite)
-            
-            # Store results
-            all_results.append({
-                'module': module,
-                'result': result,
-                'output': stream.getvalue()
-            })
-            
-            # Update totals
-            total_tests += result.testsRun
-            total_failures += len(result.failures)
-            total_errors += len(result.errors)
-            
-            # Print summary for this module
-            print(f"✅ Tests run: {result.testsRun}")
-            print(f"❌ Failures: {len(result.failures)}")
-            print(f"💥 Errors: {len(result.errors)}")
-            
-            if result.failures:
-                print("Failures:")
-                for test, traceback in result.failures:
-                    print(f"  - {test}: {traceback.split('\\n')[-2]}")
-            
-            if result.errors:
-                print("Errors:")
-                for test, traceback in result.errors:
-                    print(f"  - {test}: {traceback.split('\\n')[-2]}")
-                    
+            module_suites[module] = loader.loadTestsFromModule(importlib.import_module(module))
         except ImportError as e:
             print(f"⚠️  Could not import {module}: {e}")
-            continue
         except Exception as e:
-            print(f"💥 Error running tests for {module}: {e}")
-            continue
+            print(f"💥 Error loading tests for {module}: {e}")
+    
+    module_test_counts = {module: suite.countTestCases() for module, suite in module_suites.items()}
+    suite = unittest.TestSuite(module_suites.values())
+    
+    print(f"\n🔍 Running {suite.countTestCases()} tests from {len(module_suites)} modules")
+    
+    stream = StringIO()
+    runner = unittest.TextTestRunner(
+        stream=stream, 
+        verbosity=2,
+        buffer=True,
+        failfast=False
+    )
+    result = runner.run(suite)
+    
+    total_tests = result.testsRun
+    total_failures = len(result.failures)
+    total_errors = len(result.errors)
+    
+    # Per-module summary
+    for module, test_count in module_test_counts.items():
+        failures = [(test, tb) for test, tb in result.failures if type(test).__module__ == module]
+        errors = [(test, tb) for test, tb in result.errors if type(test).__module__ == module]
+        
+        print(f"\n🔍 Tests from {module}")
+        print("-" * 40)
+        print(f"✅ Tests run: {test_count}")
+        print(f"❌ Failures: {len(failures)}")
+        print(f"💥 Errors: {len(errors)}")
+        
+        if failures:
+            print("Failures:")
+            for test, traceback in failures:
+                print(f"  - {test}: {traceback.splitlines()[-1]}")
+        
+        if errors:
+            print("Errors:")
+            for test, traceback in errors:
+                print(f"  - {test}: {traceback.splitlines()[-1]}")
     
     end_time = time.time()
     duration = end_time - start_time
@@ -106,18 +96,13 @@ def run_test_suite():
         print(f"\n🔍 DETAILED FAILURE ANALYSIS")
         print("=" * 60)
         
-        for module_result in all_results:
-            result = module_result['result']
-            if result.failures or result.errors:
-                print(f"\nModule: {module_result['module']}")
-                
-                for test, traceback in result.failures:
-                    print(f"\n❌ FAILURE: {test}")
-                    print(traceback)
-                
-                for test, traceback in result.errors:
-                    print(f"\n💥 ERROR: {test}")
-                    print(traceback)
+        for test, traceback in result.failures:
+            print(f"\n❌ FAILURE: {test}")
+            print(traceback)
+        
+        for test, traceback in result.errors:
+            print(f"\n💥 ERROR: {test}")
+            print(traceback)
     
     # Performance metrics from monitoring tests
     try:
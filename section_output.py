@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Concurrent section runner for the demo and test scripts
+Runs independent sections on worker threads and keeps each section's printed output together
+"""
+
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Sequence, Tuple
+
+class ThreadLocalStdout:
+    """Routes writes to a per-thread buffer while one is active, else to the real stdout"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    def start_capture(self) -> io.StringIO:
+        """Start buffering the calling thread's output and return the buffer"""
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+    
+    def stop_capture(self):
+        """Stop buffering the calling thread's output (pool threads are reused by later sections)"""
+        self._local.buffer = None
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer or self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def _run_captured(stdout_proxy: ThreadLocalStdout, section: Callable[[], Any]) -> Tuple[Any, str]:
+    """Run one section and return (its result, everything it printed)"""
+    buffer = stdout_proxy.start_capture()
+    try:
+        result = section()
+    finally:
+        stdout_proxy.stop_capture()
+    return result, buffer.getvalue()
+
+def run_sections_concurrently(sections: Sequence[Callable[[], Any]]) -> List[Tuple[Any, str]]:
+    """Run zero-argument sections concurrently; return (result, printed output) per section, in order
+    
+    sys.stdout is swapped for a ThreadLocalStdout while the sections run, so
+    their prints do not interleave. Callers replay the outputs in order.
+    """
+    if not sections:
+        return []
+    
+    original_stdout = sys.stdout
+    stdout_proxy = ThreadLocalStdout(original_stdout)
+    sys.stdout = stdout_proxy
+    try:
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            futures = [executor.submit(_run_captured, stdout_proxy, section) for section in sections]
+            return [future.result() for future in futures]
+    finally:
+        sys.stdout = original_stdout
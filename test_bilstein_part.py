@@ -35,9 +35,8 @@ def test_bilstein_part():
     print(f"🔍 Testing: {test_product[BRAND_COLUMN_SOURCE]} {test_product[PART_NUMBER_COLUMN_SOURCE]}")
     
     # Check brand registry
-    brand_upper = test_product[BRAND_COLUMN_SOURCE].upper()
-    if brand_upper in agent.brand_registry:
-        brand_info = agent.brand_registry[brand_upper]
+    _, brand_info = agent._lookup_brand(test_product[BRAND_COLUMN_SOURCE])
+    if brand_info:
         print(f"✓ Brand in registry - Authority: {brand_info['authority']}")
         print(f"  Domains: {brand_info['domains']}")
     
@@ -48,9 +47,11 @@ def test_bilstein_part():
         if image_paths:
             print(f"\n✅ Found {len(image_paths)} image(s)")
             for path in image_paths:
-                if os.path.exists(path):
-                    size = os.path.getsize(path) / 1024
-                    print(f"  📁 {path} ({size:.1f} KB)")
+                try:
+                    size = os.stat(path).st_size / 1024
+                except FileNotFoundError:
+                    continue
+                print(f"  📁 {path} ({size:.1f} KB)")
         else:
             print(f"\n❌ No images found - this is normal if no official images available")
             
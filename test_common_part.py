@@ -43,9 +43,8 @@ def test_common_parts():
         
         try:
             # Test the brand registry lookup first
-            brand_upper = product[BRAND_COLUMN_SOURCE].upper()
-            if brand_upper in agent.brand_registry:
-                brand_info = agent.brand_registry[brand_upper]
+            brand_upper, brand_info = agent._lookup_brand(product[BRAND_COLUMN_SOURCE])
+            if brand_info:
                 print(f"✓ Brand found in registry:")
                 print(f"  Authority: {brand_info['authority']}")
                 print(f"  Domains: {brand_info['domains']}")
@@ -59,11 +58,12 @@ def test_common_parts():
             if image_paths:
                 print(f"\n✅ SUCCESS: Found {len(image_paths)} image(s)")
                 for path in image_paths:
-                    if os.path.exists(path):
-                        file_size = os.path.getsize(path) / 1024
-                        print(f"  📁 {path} ({file_size:.1f} KB)")
-                    else:
+                    try:
+                        file_size = os.stat(path).st_size / 1024
+                    except FileNotFoundError:
                         print(f"  ❌ {path} (not found)")
+                    else:
+                        print(f"  📁 {path} ({file_size:.1f} KB)")
             else:
                 print(f"\n❌ No official images found")
                 
@@ -10,119 +10,171 @@ import shutil
 import os
 import pandas as pd
 import json
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, mock_open
+from types import SimpleNamespace
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from io import BytesIO, StringIO
+import openpyxl
+from PIL import Image
 
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import main components
 import config
-from agents.image_agent import ImageSourcingAgent
-from agents.vehicle_application_agent import VehicleApplicationAgent
-from agents.bigcommerce_agent import BigCommerceUploaderAgent
-from monitoring import performance_monitor, get_main_logger
+from monitoring import get_main_logger
+
+try:
+    from main import load_source_products, process_single_product
+except ImportError:
+    # main.py needs the Google client libraries, which the pipeline test also patches
+    load_source_products = process_single_product = None
+from monitoring.performance_monitor import PerformanceMonitor
+
+# The submodule itself; the package attribute of the same name is the monitor instance
+performance_monitor_module = sys.modules['monitoring.performance_monitor']
+
+# Source products fixture (TEST-EXISTING is filtered out as an existing SKU)
+_FIXTURE_PRODUCTS = [
+    {
+        config.PART_NUMBER_COLUMN_SOURCE: 'HB659N.710',
+        config.BRAND_COLUMN_SOURCE: 'Hawk Performance',
+        config.DESCRIPTION_COLUMN_EN_SOURCE: 'HPS 5.0 Brake Pads Front',
+        config.APPLICATION_COLUMN_SOURCE: 'Honda Civic 2016-2021',
+        config.QTY_COLUMN_SOURCE: '1',
+        config.PRICE_COLUMN_SOURCE: '89.99'
+    },
+    {
+        config.PART_NUMBER_COLUMN_SOURCE: 'B4-B112H2',
+        config.BRAND_COLUMN_SOURCE: 'Bilstein',
+        config.DESCRIPTION_COLUMN_EN_SOURCE: 'B4 OE Replacement Shock Absorber',
+        config.APPLICATION_COLUMN_SOURCE: 'BMW 3 Series 2012-2018',
+        config.QTY_COLUMN_SOURCE: '1',
+        config.PRICE_COLUMN_SOURCE: '156.78'
+    },
+    {
+        config.PART_NUMBER_COLUMN_SOURCE: 'TEST-EXISTING',
+        config.BRAND_COLUMN_SOURCE: 'Test Brand',
+        config.DESCRIPTION_COLUMN_EN_SOURCE: 'Already Exists Product',
+        config.APPLICATION_COLUMN_SOURCE: 'Universal',
+        config.QTY_COLUMN_SOURCE: '1',
+        config.PRICE_COLUMN_SOURCE: '25.00'
+    }
+]
+
+def _build_fixture_xlsx(rows):
+    """Serialize rows to xlsx bytes with a write-only openpyxl workbook"""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    columns = list(rows[0])
+    sheet.append(columns)
+    for row in rows:
+        sheet.append([row[column] for column in columns])
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+# Encoded once at import; each test reads from its own in-memory buffer
+_FIXTURE_XLSX_BYTES = _build_fixture_xlsx(_FIXTURE_PRODUCTS)
+
+# Existing SKUs (to test deduplication)
+_FIXTURE_EXISTING_SKUS_CSV = pd.DataFrame([
+    {config.SKU_COLUMN_STORE_EXPORT: 'TEST-EXISTING'},
+    {config.SKU_COLUMN_STORE_EXPORT: 'OTHER-EXISTING-SKU'}
+]).to_csv(index=False)
+
+# Existing descriptions (empty for test)
+_FIXTURE_EXISTING_DESCRIPTIONS_CSV = pd.DataFrame([
+    {
+        config.SKU_COLUMN_EXISTING_DESC_EXPORT: 'SOME-OTHER-SKU',
+        config.HTML_DESCRIPTION_COLUMN_EXISTING_DESC_EXPORT: '<p>Existing description</p>'
+    }
+]).to_csv(index=False)
+
+def _build_fixture_image(size=(800, 600)):
+    """Encode a plain white image, so the image agent's real PIL checks pass (uncompressed BMP; no codec work)"""
+    buffer = BytesIO()
+    Image.new('RGB', size, (255, 255, 255)).save(buffer, format='BMP')
+    return buffer.getvalue()
+
+# Served by the mocked image session in place of a downloaded product photo
+_FIXTURE_IMAGE_BYTES = _build_fixture_image()
+
+# External clients replaced for the pipeline test, keyed by the name _setup_mocks uses
+_PIPELINE_PATCH_TARGETS = {
+    'google_search': 'agents.image_agent.GoogleSearch',
+    'image_session': 'agents.image_agent.requests.Session',
+    'vehicle_session': 'agents.vehicle_application_agent.requests.Session',
+    'bc_requests': 'agents.bigcommerce_agent.requests',
+    'translate_client': 'google.cloud.translate_v2.Client',
+    'gemini_model': 'google.generativeai.GenerativeModel'
+}
+
+class _StubResponse:
+    """Canned HTTP response; plain attributes instead of MagicMock attribute chains"""
+    
+    def __init__(self, status_code=200, payload=None, content=b'', headers=None, text=''):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.content = content
+        self.headers = headers or {}
+        self.text = text
+        self._payload = payload if payload is not None else {}
+    
+    def json(self):
+        return self._payload
+    
+    def raise_for_status(self):
+        pass
 
 class TestCompleteSystemIntegration(unittest.TestCase):
     """Complete end-to-end system integration test"""
     
     def setUp(self):
         """Set up test environment with mock dependencies"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.test_data_dir = os.path.join(self.temp_dir, 'test_data')
-        os.makedirs(self.test_data_dir, exist_ok=True)
-        
-        # Clear performance monitor
-        performance_monitor.metrics_history.clear()
-        performance_monitor.active_operations.clear()
-        
-        # Create test Excel data
-        self.test_excel_path = os.path.join(self.test_data_dir, 'test_products.xlsx')
-        self._create_test_excel_data()
-        
-        # Create test CSV exports
-        self.existing_skus_path = os.path.join(self.test_data_dir, 'existing_skus.csv')
-        self.existing_descriptions_path = os.path.join(self.test_data_dir, 'existing_descriptions.csv')
-        self._create_test_csv_exports()
-    
-    def tearDown(self):
-        """Clean up test environment"""
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
-    def _create_test_excel_data(self):
-        """Create test Excel data file"""
-        test_data = [
-            {
-                config.PART_NUMBER_COLUMN_SOURCE: 'HB659N.710',
-                config.BRAND_COLUMN_SOURCE: 'Hawk Performance',
-                config.DESCRIPTION_COLUMN_EN_SOURCE: 'HPS 5.0 Brake Pads Front',
-                config.APPLICATION_COLUMN_SOURCE: 'Honda Civic 2016-2021',
-                config.QTY_COLUMN_SOURCE: '1',
-                config.PRICE_COLUMN_SOURCE: '89.99'
-            },
-            {
-                config.PART_NUMBER_COLUMN_SOURCE: 'B4-B112H2',
-                config.BRAND_COLUMN_SOURCE: 'Bilstein',
-                config.DESCRIPTION_COLUMN_EN_SOURCE: 'B4 OE Replacement Shock Absorber',
-                config.APPLICATION_COLUMN_SOURCE: 'BMW 3 Series 2012-2018',
-                config.QTY_COLUMN_SOURCE: '1',
-                config.PRICE_COLUMN_SOURCE: '156.78'
-            },
-            {
-                config.PART_NUMBER_COLUMN_SOURCE: 'TEST-EXISTING',
-                config.BRAND_COLUMN_SOURCE: 'Test Brand',
-                config.DESCRIPTION_COLUMN_EN_SOURCE: 'Already Exists Product',
-                config.APPLICATION_COLUMN_SOURCE: 'Universal',
-                config.QTY_COLUMN_SOURCE: '1',
-                config.PRICE_COLUMN_SOURCE: '25.00'
-            }
-        ]
-        
-        df = pd.DataFrame(test_data)
-        df.to_excel(self.test_excel_path, index=False, engine='openpyxl')
-    
-    def _create_test_csv_exports(self):
-        """Create test CSV export files"""
-        # Existing SKUs (to test deduplication)
-        existing_skus_data = [
-            {config.SKU_COLUMN_STORE_EXPORT: 'TEST-EXISTING'},
-            {config.SKU_COLUMN_STORE_EXPORT: 'OTHER-EXISTING-SKU'}
-        ]
-        pd.DataFrame(existing_skus_data).to_csv(self.existing_skus_path, index=False)
-        
-        # Existing descriptions (empty for test)
-        existing_desc_data = [
-            {
-                config.SKU_COLUMN_EXISTING_DESC_EXPORT: 'SOME-OTHER-SKU',
-                config.HTML_DESCRIPTION_COLUMN_EXISTING_DESC_EXPORT: '<p>Existing description</p>'
-            }
-        ]
-        pd.DataFrame(existing_desc_data).to_csv(self.existing_descriptions_path, index=False)
+        # Fresh performance monitor for this test
+        self.pm = PerformanceMonitor()
+        monitor_patch = patch.object(performance_monitor_module, 'performance_monitor', self.pm)
+        monitor_patch.start()
+        self.addCleanup(monitor_patch.stop)
+        
+        # In-memory fixtures; nothing touches the disk
+        self.test_excel = BytesIO(_FIXTURE_XLSX_BYTES)
+        self.existing_skus_csv = StringIO(_FIXTURE_EXISTING_SKUS_CSV)
+        self.existing_descriptions_csv = StringIO(_FIXTURE_EXISTING_DESCRIPTIONS_CSV)
     
-    @patch('agents.image_agent.GoogleSearch')
-    @patch('agents.image_agent.requests.Session')
-    @patch('agents.vehicle_application_agent.requests.Session')
-    @patch('agents.bigcommerce_agent.requests')
-    @patch('google.cloud.translate_v2.Client')
-    @patch('google.generativeai.GenerativeModel')
-    def test_complete_pipeline_flow(self, mock_gemini_model, mock_translate_client, 
-                                   mock_bc_requests, mock_vehicle_session, 
-                                   mock_image_session, mock_google_search):
+    @unittest.skipIf(process_single_product is None, "main import failed")
+    def test_complete_pipeline_flow(self):
         """Test complete pipeline from Excel to BigCommerce with all enhancements"""
-        
-        # Mock API responses
-        self._setup_mocks(mock_gemini_model, mock_translate_client, mock_bc_requests,
-                         mock_vehicle_session, mock_image_session, mock_google_search)
-        
-        # Override config paths for testing
-        with patch.object(config, 'SOURCE_PRODUCTS_FILE_PATH', self.test_excel_path), \
-             patch.object(config, 'EXISTING_STORE_SKUS_CSV_PATH', self.existing_skus_path), \
-             patch.object(config, 'EXISTING_DESCRIPTIONS_CSV_PATH', self.existing_descriptions_path), \
-             patch.object(config, 'MAX_PRODUCTS_TO_PROCESS_IN_BATCH', 10), \
-             patch.object(config, 'MAX_CONCURRENT_WORKERS', 2):
+        with ExitStack() as stack:
+            mocks = {name: stack.enter_context(patch(target))
+                     for name, target in _PIPELINE_PATCH_TARGETS.items()}
+            mock_translate_client = mocks['translate_client']
+            mock_gemini_model = mocks['gemini_model']
+            
+            # Mock API responses
+            self._setup_mocks(mock_gemini_model, mock_translate_client, mocks['bc_requests'],
+                              mocks['vehicle_session'], mocks['image_session'], mocks['google_search'])
+            
+            # Override config paths for testing
+            config_overrides = {
+                'SOURCE_PRODUCTS_FILE_PATH': self.test_excel,
+                'EXISTING_STORE_SKUS_CSV_PATH': self.existing_skus_csv,
+                'EXISTING_DESCRIPTIONS_CSV_PATH': self.existing_descriptions_csv,
+                'MAX_PRODUCTS_TO_PROCESS_IN_BATCH': 10,
+                'MAX_CONCURRENT_WORKERS': 2
+            }
+            for name, value in config_overrides.items():
+                stack.enter_context(patch.object(config, name, value))
+            
+            # Initialize agents (imported here; only this test needs them)
+            from agents.image_agent import ImageSourcingAgent
+            from agents.vehicle_application_agent import VehicleApplicationAgent
+            from agents.bigcommerce_agent import BigCommerceUploaderAgent
             
-            # Initialize agents
             image_agent = ImageSourcingAgent('test_serp_key')
             vehicle_agent = VehicleApplicationAgent()
             bc_agent = BigCommerceUploaderAgent('test_store_hash', 'test_token')
@@ -143,30 +195,26 @@ class TestCompleteSystemIntegration(unittest.TestCase):
                 'existing_descs': {}
             }
             
-            # Import the process function
-            from main import load_source_products, process_single_product
-            
             # Load products
-            all_products = load_source_products(self.test_excel_path)
-            self.assertEqual(len(all_products), 3)
+            products_df = load_source_products(self.test_excel, as_records=False)
+            self.assertEqual(len(products_df), 3)
             
-            # Filter out existing products (simulating main.py logic)
-            new_products = [
-                p for p in all_products 
-                if p.get(config.PART_NUMBER_COLUMN_SOURCE) not in agents['existing_skus']
-            ]
+            # Filter out existing products (same isin mask as main.py)
+            new_mask = ~products_df[config.PART_NUMBER_COLUMN_SOURCE].isin(agents['existing_skus'])
+            new_products = products_df[new_mask].to_dict('records')
             
             # Should have 2 new products (TEST-EXISTING filtered out)
             self.assertEqual(len(new_products), 2)
             
-            # Process each product
-            results = []
-            for product in new_products:
-                result = process_single_product(product, agents)
-                results.append(result)
+            # Process products concurrently, as main.py does
+            with ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_WORKERS) as executor:
+                results = list(executor.map(lambda product: process_single_product(product, agents),
+                                            new_products))
             
             # Validate results
             self.assertEqual(len(results), 2)
+            self.assertEqual(sorted(r['source_sku'] for r in results),
+                             sorted(p[config.PART_NUMBER_COLUMN_SOURCE] for p in new_products))
             
             # Check that all products were processed successfully
             successful_results = [r for r in results if 'Failed' not in r.get('status', '')]
@@ -190,7 +238,7 @@ class TestCompleteSystemIntegration(unittest.TestCase):
                     self.assertIn('official_applications_found', result)
             
             # Check performance metrics were recorded
-            stats = performance_monitor.get_performance_stats()
+            stats = self.pm.get_performance_stats()
             
             # Should have metrics for main pipeline operations
             expected_operations = [
@@ -219,8 +267,7 @@ class TestCompleteSystemIntegration(unittest.TestCase):
         """Set up all necessary mocks for testing"""
         
         # Mock Google Search (SerpAPI)
-        mock_search_instance = MagicMock()
-        mock_search_instance.get_dict.return_value = {
+        search_results = {
             'images_results': [
                 {
                     'original': 'https://example.com/image1.jpg',
@@ -229,39 +276,29 @@ class TestCompleteSystemIntegration(unittest.TestCase):
                 }
             ]
         }
-        mock_google_search.return_value = mock_search_instance
+        mock_google_search.return_value = SimpleNamespace(get_dict=lambda: search_results)
         
         # Mock image session requests
-        mock_image_response = MagicMock()
-        mock_image_response.status_code = 200
-        mock_image_response.content = b'fake_image_data'
-        mock_image_response.headers = {'content-type': 'image/jpeg'}
-        mock_image_session.return_value.get.return_value = mock_image_response
+        mock_image_session.return_value.get.return_value = _StubResponse(
+            content=_FIXTURE_IMAGE_BYTES, headers={'content-type': 'image/bmp'})
         
         # Mock vehicle application session
-        mock_vehicle_response = MagicMock()
-        mock_vehicle_response.status_code = 200
-        mock_vehicle_response.text = """
+        mock_vehicle_session.return_value.get.return_value = _StubResponse(text="""
         <div class="vehicle-app">2016-2021 Honda Civic Si</div>
         <div class="vehicle-app">2017-2021 Honda Civic Type R</div>
-        """
-        mock_vehicle_session.return_value.get.return_value = mock_vehicle_response
+        """)
         
         # Mock BigCommerce API responses
-        mock_bc_create_response = MagicMock()
-        mock_bc_create_response.status_code = 201
-        mock_bc_create_response.json.return_value = {
+        mock_bc_create_response = _StubResponse(201, {
             'data': {'id': 12345, 'name': 'Test Product', 'sku': 'TEST-SKU'}
-        }
-        
-        mock_bc_image_response = MagicMock()
-        mock_bc_image_response.status_code = 201
-        mock_bc_image_response.json.return_value = {
+        })
+        mock_bc_image_response = _StubResponse(201, {
             'data': {'id': 67890, 'product_id': 12345}
-        }
+        })
         
-        mock_bc_requests.post.side_effect = [mock_bc_create_response, mock_bc_image_response]
-        mock_bc_requests.get.return_value.json.return_value = {'data': []}  # Empty categories/brands
+        mock_bc_session = mock_bc_requests.Session.return_value
+        mock_bc_session.post.side_effect = [mock_bc_create_response, mock_bc_image_response]
+        mock_bc_session.get.return_value = _StubResponse(payload={'data': []})  # Empty categories/brands
         
         # Mock Google Translate
         mock_translate_client.return_value.translate.return_value = {
@@ -269,17 +306,8 @@ class TestCompleteSystemIntegration(unittest.TestCase):
         }
         
         # Mock Google Gemini
-        mock_response = MagicMock()
-        mock_response.text = 'Descripción generada por IA para el producto de alta calidad.'
-        mock_gemini_model.return_value.generate_content.return_value = mock_response
-        
-        # Mock PIL Image operations
-        with patch('agents.image_agent.Image.open') as mock_pil:
-            mock_img = MagicMock()
-            mock_img.size = (800, 600)
-            mock_img.mode = 'RGB'
-            mock_img.getpixel.return_value = (255, 255, 255)  # White background
-            mock_pil.return_value = mock_img
+        mock_gemini_model.return_value.generate_content.return_value = SimpleNamespace(
+            text='Descripción generada por IA para el producto de alta calidad.')
     
     def test_error_handling_and_resilience(self):
         """Test system behavior under error conditions"""
@@ -294,17 +322,18 @@ class TestCompleteSystemIntegration(unittest.TestCase):
         ]
         
         for scenario in error_scenarios:
-            with self.subTest(scenario=scenario['type']):
-                logger.info(f"Testing error scenario: {scenario['type']}")
-                
-                # Record that we tested this scenario
-                performance_monitor.record_instant_metric(
-                    'test_agent', 'error_simulation', False, 0.1,
-                    {'error_type': scenario['type'], 'should_retry': scenario['should_retry']}
-                )
+            logger.info(f"Testing error scenario: {scenario['type']}")
+        
+        # Record that we tested each scenario, in one batch
+        start = time.perf_counter()
+        self.pm.record_many('test_agent', [
+            ('error_simulation', start, start + 0.1, scenario['type'],
+             {'error_type': scenario['type'], 'should_retry': scenario['should_retry']})
+            for scenario in error_scenarios
+        ])
         
         # Check that error metrics were recorded
-        failures = performance_monitor.get_recent_failures(hours=1)
+        failures = self.pm.get_recent_failures(hours=1)
         self.assertEqual(len(failures), 4)
         
         # Verify error types were recorded
@@ -318,22 +347,22 @@ class TestCompleteSystemIntegration(unittest.TestCase):
         """Test performance monitoring thresholds and alerting"""
         # Simulate operations that exceed performance thresholds
         
+        start = time.perf_counter()
+        
         # Slow image sourcing (should trigger alert)
-        performance_monitor.record_instant_metric(
-            'image_agent', 'image_sourcing', True, 65.0,  # Exceeds 60s threshold
-            {'part_number': 'SLOW-PART'}
+        timings = [('image_sourcing', start, start + 65.0, None,  # Exceeds 60s threshold
+                    {'part_number': 'SLOW-PART'})]
+        
+        # Multiple failures for success rate alert (30% success, below 70% threshold)
+        timings.extend(
+            ('image_sourcing', start, start + 5.0, None if i < 3 else 'Image not found',
+             {'part_number': f'TEST-{i}'})
+            for i in range(10)
         )
-        
-        # Multiple failures for success rate alert
-        for i in range(10):
-            success = i < 3  # 30% success rate (below 70% threshold)
-            performance_monitor.record_instant_metric(
-                'image_agent', 'image_sourcing', success, 5.0,
-                {'part_number': f'TEST-{i}'}
-            )
+        self.pm.record_many('image_agent', timings)
         
         # Get performance stats
-        stats = performance_monitor.get_performance_stats()
+        stats = self.pm.get_performance_stats()
         
         if 'image_agent_image_sourcing' in stats:
             stat = stats['image_agent_image_sourcing']
@@ -350,6 +379,13 @@ class TestCompleteSystemIntegration(unittest.TestCase):
 class TestSystemRobustness(unittest.TestCase):
     """Test system robustness under various conditions"""
     
+    def setUp(self):
+        """Give each test its own performance monitor"""
+        self.pm = PerformanceMonitor()
+        monitor_patch = patch.object(performance_monitor_module, 'performance_monitor', self.pm)
+        monitor_patch.start()
+        self.addCleanup(monitor_patch.stop)
+    
     def test_large_batch_processing(self):
         """Test system performance with larger batches"""
         logger = get_main_logger()
@@ -360,7 +396,7 @@ class TestSystemRobustness(unittest.TestCase):
         
         for i in range(batch_size):
             with patch('time.sleep'):  # Skip actual delays
-                performance_monitor.record_instant_metric(
+                self.pm.record_instant_metric(
                     'batch_test', 'product_processing', True, 0.1,
                     {'batch_index': i, 'sku': f'TEST-{i:03d}'}
                 )
@@ -371,7 +407,7 @@ class TestSystemRobustness(unittest.TestCase):
         logger.performance(f"Processed {batch_size} products", duration=processing_time)
         
         # Verify all operations were recorded
-        stats = performance_monitor.get_performance_stats()
+        stats = self.pm.get_performance_stats()
         
         if 'batch_test_product_processing' in stats:
             stat = stats['batch_test_product_processing']
@@ -381,7 +417,6 @@ class TestSystemRobustness(unittest.TestCase):
     def test_concurrent_processing_simulation(self):
         """Test concurrent processing capabilities"""
         import threading
-        import time
         
         results = []
         errors = []
@@ -390,17 +425,17 @@ class TestSystemRobustness(unittest.TestCase):
             """Simulate a worker thread processing items"""
             try:
                 for i in range(num_items):
-                    with performance_monitor.start_operation('worker', f'thread_{worker_id}') as op_id:
-                        time.sleep(0.01)  # Simulate work
-                        performance_monitor.end_operation(op_id, True, {'item': i})
-                        results.append(f"worker_{worker_id}_item_{i}")
+                    # No simulated work: the point is concurrent start/end on the monitor
+                    op_id = self.pm.start_operation('worker', f'thread_{worker_id}')
+                    self.pm.end_operation(op_id, True, {'item': i})
+                    results.append(f"worker_{worker_id}_item_{i}")
             except Exception as e:
                 errors.append(str(e))
         
         # Start multiple worker threads
         threads = []
-        num_workers = 5
-        items_per_worker = 10
+        num_workers = 16
+        items_per_worker = 50
         
         for worker_id in range(num_workers):
             thread = threading.Thread(
@@ -419,11 +454,13 @@ class TestSystemRobustness(unittest.TestCase):
         self.assertEqual(len(results), num_workers * items_per_worker)
         
         # Check performance metrics
-        stats = performance_monitor.get_performance_stats()
+        stats = self.pm.get_performance_stats()
         
         # Should have metrics for each worker
         worker_stats = {k: v for k, v in stats.items() if k.startswith('worker_')}
-        self.assertGreater(len(worker_stats), 0)
+        self.assertEqual(len(worker_stats), num_workers)
+        for stat in worker_stats.values():
+            self.assertEqual(stat.total_operations, items_per_worker)
         
         # All operations should be successful
         for stat in worker_stats.values():
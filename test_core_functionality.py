@@ -5,49 +5,59 @@ Core functionality test for ImageSourcingAgent (no API calls)
 
 import os
 import sys
+import unittest
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from agents.image_agent import ImageSourcingAgent
 
-def test_core_functionality():
-    """Test core functionality without API calls"""
-    print("🧪 TESTING CORE IMAGE AGENT FUNCTIONALITY")
-    print("=" * 50)
-    
-    # Initialize agent without API key
-    agent = ImageSourcingAgent(None)
-    
-    # Test 1: Brand Registry
-    print("✓ Brand registry initialized with brands:")
-    for brand in list(agent.brand_registry.keys())[:5]:  # Show first 5
-        info = agent.brand_registry[brand]
-        print(f"  - {brand}: Authority {info['authority']}, Domains: {len(info['domains'])}")
-    print(f"  ... and {len(agent.brand_registry) - 5} more brands\n")
-    
-    # Test 2: Authority Scoring
-    print("✓ Authority scoring test:")
-    test_cases = [
-        ("https://parts.ford.com/products/abc123", "FORD", "Should be 95"),
-        ("https://ebay.com/item/123", "FORD", "Should be 0"),
-        ("https://knfilters.com/product/123", "K&N", "Should be 85"),
+class TestImageAgentCore(unittest.TestCase):
+    """Registry, authority scoring and part number extraction without API calls"""
+
+    # (url, brand, expected authority)
+    AUTHORITY_CASES = [
+        ("https://parts.ford.com/products/abc123", "FORD", 95),
+        ("https://ebay.com/item/123", "FORD", 0),
+        ("https://knfilters.com/product/123", "K&N", 85),
+    ]
+
+    # (text, target part number)
+    EXTRACTION_CASES = [
+        ("Ford Motorcraft Air Filter FA-1883 for 2015-2020 F-150", "FA-1883"),
     ]
-    
-    for url, brand, expected in test_cases:
-        authority = agent._get_domain_authority(url, brand)
-        print(f"  {url} + {brand} = Authority {authority} ({expected})")
-    print()
-    
-    # Test 3: Part Number Extraction
-    print("✓ Part number extraction test:")
-    test_text = "Ford Motorcraft Air Filter FA-1883 for 2015-2020 F-150"
-    found_numbers = agent._extract_part_numbers_from_text(test_text)
-    is_match = agent._validate_part_number_match(found_numbers, "FA-1883")
-    print(f"  Text: {test_text}")
-    print(f"  Found: {found_numbers}")
-    print(f"  Match with FA-1883: {is_match}")
-    print()
-    
-    print("🎉 Core functionality tests completed successfully!")
+
+    @classmethod
+    def setUpClass(cls):
+        """Build one agent (brand registry and compiled patterns) for every case"""
+        cls.agent = ImageSourcingAgent(None)
+
+    def test_brand_registry(self):
+        """Test brand registry entries carry domains and an authority score"""
+        self.assertGreater(len(self.agent.brand_registry), 5)
+        for brand, info in self.agent.brand_registry.items():
+            with self.subTest(brand=brand):
+                self.assertTrue(info['domains'])
+                self.assertIn('authority', info)
+
+    def test_authority_scoring(self):
+        """Test domain authority for official, marketplace and pattern-matched sites"""
+        for url, brand, expected in self.AUTHORITY_CASES:
+            with self.subTest(url=url, brand=brand):
+                self.assertEqual(self.agent._get_domain_authority(url, brand), expected)
+
+    def test_part_number_extraction(self):
+        """Test extracted part numbers match the target part number"""
+        for text, target in self.EXTRACTION_CASES:
+            with self.subTest(text=text):
+                found_numbers = self.agent._extract_part_numbers_from_text(text)
+                self.assertIn(target, found_numbers)
+                self.assertTrue(self.agent._validate_part_number_match(found_numbers, target))
+
+    def test_repeated_part_number_extraction(self):
+        """Test repeated extraction with the agent's compiled patterns gives the same result"""
+        text, target = self.EXTRACTION_CASES[0]
+        first = self.agent._extract_part_numbers_from_text(text)
+        self.assertIn(target, first)
+        self.assertEqual(self.agent._extract_part_numbers_from_text(text), first)
 
 if __name__ == "__main__":
-    test_core_functionality()
\ No newline at end of file
+    unittest.main(verbosity=2)
@@ -6,27 +6,80 @@ Test enhanced image validation system
 import os
 import sys
 import io
+import functools
+import threading
+import unittest
+from collections import namedtuple
 from PIL import Image
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from agents.image_agent import ImageSourcingAgent
+from section_output import run_sections_concurrently
 
+# One agent for every test; no API key needed for validation tests
+AGENT = ImageSourcingAgent(None)
+
+# Encoded bytes for _enhanced_image_validation plus the source image for the per-image checks
+ImageFixture = namedtuple('ImageFixture', ['bytes', 'pil_image'])
+
+# One reusable encode buffer per thread (the test sections run concurrently)
+_buffers = threading.local()
+
+def _encode_buffer():
+    """This thread's encode buffer, emptied for reuse"""
+    buffer = getattr(_buffers, 'buffer', None)
+    if buffer is None:
+        buffer = _buffers.buffer = io.BytesIO()
+    buffer.seek(0)
+    buffer.truncate()
+    return buffer
+
+@functools.lru_cache(maxsize=64)
 def create_test_image(width, height, color=(255, 255, 255)):
-    """Create a test image with specified dimensions and color"""
+    """Create a test image with specified dimensions and color (built once per argument set)"""
     img = Image.new('RGB', (width, height), color)
-    buffer = io.BytesIO()
-    img.save(buffer, format='JPEG')
-    return buffer.getvalue()
+    buffer = _encode_buffer()
+    # Uncompressed BMP: solid colors need no codec, and the validator sniffs the format itself
+    img.save(buffer, format='BMP')
+    return ImageFixture(buffer.getvalue(), img)
+
+# Complete validation pipeline scenarios, shared by the script and the unittest cases
+VALIDATION_SCENARIOS = [
+    {
+        'name': 'High-quality product image',
+        'image': create_test_image(1000, 800).bytes,
+        'part_number': 'ABC-123',
+        'brand': 'HONDA',
+        'url': 'https://honda.com/parts/abc123.jpg',
+        'expected_valid': True
+    },
+    {
+        'name': 'Low-quality image',
+        'image': create_test_image(200, 150).bytes,
+        'part_number': 'XYZ-789',
+        'brand': 'TOYOTA',
+        'url': 'https://toyota.com/parts/xyz789.jpg',
+        'expected_valid': False
+    },
+    {
+        'name': 'Placeholder image',
+        'image': create_test_image(300, 300).bytes,
+        'part_number': 'DEF-456',
+        'brand': 'FORD',
+        'url': 'https://ford.com/placeholder.jpg',
+        'expected_valid': False  # Rejected on the placeholder URL before decoding
+    }
+]
 
 def test_basic_validation():
     """Test basic image validation functions"""
     print("🧪 TESTING BASIC IMAGE VALIDATION")
     print("=" * 50)
     
-    agent = ImageSourcingAgent(None)  # No API key needed for validation tests
+    agent = AGENT
     
     # Test 1: Valid high-resolution image
-    valid_image = create_test_image(800, 600, (255, 255, 255))
+    valid_image = create_test_image(800, 600, (255, 255, 255)).bytes
     validation = agent._enhanced_image_validation(
         valid_image, 
         "TEST-123", 
@@ -38,10 +91,12 @@ def test_basic_validation():
     print(f"   Valid: {validation['is_valid']}")
     print(f"   Quality Score: {validation['quality_score']:.2f}")
     print(f"   Dimensions: {validation['validation_details'].get('dimensions', 'N/A')}")
+    # The background check and the quality checks share one decode of these bytes
+    assert agent._decode_image(valid_image) is agent._decode_image(bytes(valid_image))
     print()
     
     # Test 2: Too small image
-    small_image = create_test_image(150, 150, (255, 255, 255))
+    small_image = create_test_image(150, 150, (255, 255, 255)).bytes
     validation = agent._enhanced_image_validation(
         small_image, 
         "TEST-123", 
@@ -55,7 +110,7 @@ def test_basic_validation():
     print()
     
     # Test 3: Non-white background
-    colored_image = create_test_image(800, 600, (255, 0, 0))  # Red background
+    colored_image = create_test_image(800, 600, (255, 0, 0)).bytes  # Red background
     validation = agent._enhanced_image_validation(
         colored_image, 
         "TEST-123", 
@@ -73,7 +128,7 @@ def test_quality_assessment():
     print("🧪 TESTING QUALITY ASSESSMENT")
     print("=" * 40)
     
-    agent = ImageSourcingAgent(None)
+    agent = AGENT
     
     # Create images with different quality characteristics
     test_cases = [
@@ -84,9 +139,13 @@ def test_quality_assessment():
         ("Extreme aspect ratio", create_test_image(1000, 200))
     ]
     
-    for test_name, image_bytes in test_cases:
-        img = Image.open(io.BytesIO(image_bytes))
-        quality_score = agent._assess_image_quality(img)
+    images = [test_image.pil_image for _, test_image in test_cases]
+    quality_scores = agent._assess_image_quality_batch(images)
+    assert quality_scores == [agent._assess_image_quality(img) for img in images]
+    # Encoded bytes score the same from their header alone
+    assert agent._assess_image_quality_batch([test_image.bytes for _, test_image in test_cases]) == quality_scores
+    
+    for (test_name, _), quality_score in zip(test_cases, quality_scores):
         print(f"{test_name:20s}: Quality score {quality_score:.2f}")
 
 def test_generic_image_detection():
@@ -94,9 +153,8 @@ def test_generic_image_detection():
     print("\n🧪 TESTING GENERIC IMAGE DETECTION")
     print("=" * 45)
     
-    agent = ImageSourcingAgent(None)
-    test_image = create_test_image(400, 400)
-    img = Image.open(io.BytesIO(test_image))
+    agent = AGENT
+    img = create_test_image(400, 400).pil_image
     
     test_urls = [
         ("Normal product image", "https://brand.com/products/part123.jpg"),
@@ -116,37 +174,9 @@ def test_validation_pipeline():
     print("\n🧪 TESTING COMPLETE VALIDATION PIPELINE")
     print("=" * 50)
     
-    agent = ImageSourcingAgent(None)
-    
-    # Create various test scenarios
-    scenarios = [
-        {
-            'name': 'High-quality product image',
-            'image': create_test_image(1000, 800),
-            'part_number': 'ABC-123',
-            'brand': 'HONDA',
-            'url': 'https://honda.com/parts/abc123.jpg',
-            'expected_valid': True
-        },
-        {
-            'name': 'Low-quality image',
-            'image': create_test_image(200, 150),
-            'part_number': 'XYZ-789',
-            'brand': 'TOYOTA',
-            'url': 'https://toyota.com/parts/xyz789.jpg',
-            'expected_valid': False
-        },
-        {
-            'name': 'Placeholder image',
-            'image': create_test_image(300, 300),
-            'part_number': 'DEF-456',
-            'brand': 'FORD',
-            'url': 'https://ford.com/placeholder.jpg',
-            'expected_valid': False  # Should be rejected due to placeholder URL
-        }
-    ]
+    agent = AGENT
     
-    for scenario in scenarios:
+    for scenario in VALIDATION_SCENARIOS:
         print(f"\nScenario: {scenario['name']}")
         validation = agent._enhanced_image_validation(
             scenario['image'],
@@ -167,40 +197,54 @@ def test_validation_pipeline():
             for factor_name, score, weight in validation['validation_details']['quality_factors']:
                 print(f"    {factor_name}: {score:.2f} (weight: {weight})")
 
-def main():
-    """Run all enhanced image validation tests"""
-    print("🚀 ENHANCED IMAGE VALIDATION SYSTEM TESTS")
-    print("=" * 70)
+class TestValidationPipeline(unittest.TestCase):
+    """Each complete validation pipeline scenario as its own subtest"""
     
-    test_results = []
+    @classmethod
+    def setUpClass(cls):
+        cls.agent = AGENT
     
-    try:
-        test_basic_validation()
-        test_results.append(("Basic Validation", True))
-    except Exception as e:
-        print(f"❌ Basic validation test failed: {e}")
-        test_results.append(("Basic Validation", False))
+    def _is_valid(self, scenario):
+        return self.agent._enhanced_image_validation(
+            scenario['image'], scenario['part_number'], scenario['brand'], scenario['url']
+        )['is_valid']
     
+    def test_scenarios(self):
+        """Test every validation scenario"""
+        for scenario in VALIDATION_SCENARIOS:
+            with self.subTest(scenario=scenario['name']):
+                self.assertEqual(self._is_valid(scenario), scenario['expected_valid'])
+
+def _run_section(label, test_func):
+    """Run one test section, returning whether it passed"""
     try:
-        test_quality_assessment()
-        test_results.append(("Quality Assessment", True))
+        test_func()
+        return True
     except Exception as e:
-        print(f"❌ Quality assessment test failed: {e}")
-        test_results.append(("Quality Assessment", False))
+        print(f"❌ {label} test failed: {e}")
+        return False
+
+def main():
+    """Run all enhanced image validation tests"""
+    print("🚀 ENHANCED IMAGE VALIDATION SYSTEM TESTS")
+    print("=" * 70)
     
-    try:
-        test_generic_image_detection()
-        test_results.append(("Generic Detection", True))
-    except Exception as e:
-        print(f"❌ Generic detection test failed: {e}")
-        test_results.append(("Generic Detection", False))
+    sections = [
+        ("Basic Validation", "Basic validation", test_basic_validation),
+        ("Quality Assessment", "Quality assessment", test_quality_assessment),
+        ("Generic Detection", "Generic detection", test_generic_image_detection),
+        ("Validation Pipeline", "Validation pipeline", test_validation_pipeline)
+    ]
     
-    try:
-        test_validation_pipeline()
-        test_results.append(("Validation Pipeline", True))
-    except Exception as e:
-        print(f"❌ Validation pipeline test failed: {e}")
-        test_results.append(("Validation Pipeline", False))
+    # The sections are independent; run them concurrently and replay their output in order
+    outcomes = run_sections_concurrently([
+        functools.partial(_run_section, label, test_func) for _, label, test_func in sections
+    ])
+    
+    test_results = []
+    for (test_name, _, _), (result, section_output) in zip(sections, outcomes):
+        print(section_output, end='')
+        test_results.append((test_name, result))
     
     # Results summary
     print("\n" + "=" * 70)
@@ -5,31 +5,47 @@ Test enhanced error handling in VehicleApplicationAgent
 
 import os
 import sys
+import unittest
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from agents.vehicle_application_agent import VehicleApplicationAgent, VehicleApplication
-from agents.image_agent import ImageSourcingAgent
 from config import PART_NUMBER_COLUMN_SOURCE, BRAND_COLUMN_SOURCE
 from dotenv import load_dotenv
 
+# One agent for every test
+AGENT = VehicleApplicationAgent()
+
+# Invalid product inputs; each should yield no applications
+INPUT_VALIDATION_CASES = [
+    ("None input", None),
+    ("Empty dict", {}),
+    ("Missing part number", {BRAND_COLUMN_SOURCE: "Honda"}),
+    ("Missing brand", {PART_NUMBER_COLUMN_SOURCE: "12345"}),
+    ("Empty strings", {PART_NUMBER_COLUMN_SOURCE: "", BRAND_COLUMN_SOURCE: ""}),
+    ("Whitespace only", {PART_NUMBER_COLUMN_SOURCE: "   ", BRAND_COLUMN_SOURCE: "   "})
+]
+
+# (name, application, expected validity)
+APPLICATION_VALIDATION_CASES = [
+    ("Valid application", VehicleApplication(year_start=2020, make="Honda", model="Civic"), True),
+    ("Missing year", VehicleApplication(make="Honda", model="Civic"), False),
+    ("Missing make", VehicleApplication(year_start=2020, model="Civic"), False),
+    ("Invalid year (too old)", VehicleApplication(year_start=1800, make="Honda", model="Civic"), False),
+    ("Invalid year (future)", VehicleApplication(year_start=2050, make="Honda", model="Civic"), False),
+    ("Invalid make (numbers)", VehicleApplication(year_start=2020, make="Honda123", model="Civic"), False),
+    ("Valid with trim", VehicleApplication(year_start=2020, make="Honda", model="Civic", trim="Si"), True),
+    ("Year range valid", VehicleApplication(year_start=2018, year_end=2022, make="Honda", model="Civic"), True),
+    ("Year range invalid", VehicleApplication(year_start=2022, year_end=2018, make="Honda", model="Civic"), False)
+]
+
 def test_input_validation():
     """Test input validation and error handling"""
     print("🧪 TESTING INPUT VALIDATION AND ERROR HANDLING")
     print("=" * 60)
     
-    agent = VehicleApplicationAgent()
+    agent = AGENT
     
-    # Test invalid inputs
-    test_cases = [
-        ("None input", None),
-        ("Empty dict", {}),
-        ("Missing part number", {BRAND_COLUMN_SOURCE: "Honda"}),
-        ("Missing brand", {PART_NUMBER_COLUMN_SOURCE: "12345"}),
-        ("Empty strings", {PART_NUMBER_COLUMN_SOURCE: "", BRAND_COLUMN_SOURCE: ""}),
-        ("Whitespace only", {PART_NUMBER_COLUMN_SOURCE: "   ", BRAND_COLUMN_SOURCE: "   "})
-    ]
-    
-    for test_name, product_info in test_cases:
+    for test_name, product_info in INPUT_VALIDATION_CASES:
         print(f"Testing {test_name}:")
         result = agent.find_and_extract_applications(product_info)
         expected = []
@@ -42,22 +58,9 @@ def test_application_validation():
     print("🧪 TESTING APPLICATION VALIDATION")
     print("=" * 40)
     
-    agent = VehicleApplicationAgent()
-    
-    # Test validation cases
-    test_applications = [
-        ("Valid application", VehicleApplication(year_start=2020, make="Honda", model="Civic")),
-        ("Missing year", VehicleApplication(make="Honda", model="Civic")),
-        ("Missing make", VehicleApplication(year_start=2020, model="Civic")),
-        ("Invalid year (too old)", VehicleApplication(year_start=1800, make="Honda", model="Civic")),
-        ("Invalid year (future)", VehicleApplication(year_start=2050, make="Honda", model="Civic")),
-        ("Invalid make (numbers)", VehicleApplication(year_start=2020, make="Honda123", model="Civic")),
-        ("Valid with trim", VehicleApplication(year_start=2020, make="Honda", model="Civic", trim="Si")),
-        ("Year range valid", VehicleApplication(year_start=2018, year_end=2022, make="Honda", model="Civic")),
-        ("Year range invalid", VehicleApplication(year_start=2022, year_end=2018, make="Honda", model="Civic"))
-    ]
-    
-    for test_name, app in test_applications:
+    agent = AGENT
+    
+    for test_name, app, _ in APPLICATION_VALIDATION_CASES:
         is_valid = agent._validate_application(app)
         print(f"{test_name:25s}: {'✅ VALID' if is_valid else '❌ INVALID'}")
         
@@ -66,7 +69,7 @@ def test_error_recovery():
     print("\n🧪 TESTING ERROR RECOVERY")
     print("=" * 30)
     
-    agent = VehicleApplicationAgent()
+    agent = AGENT
     
     # Test with invalid URLs and non-existent domains
     product_info = {
@@ -80,6 +83,25 @@ def test_error_recovery():
     
     return True
 
+class TestVehicleAgentValidation(unittest.TestCase):
+    """Input and application validation, one subtest per case"""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.agent = AGENT
+    
+    def test_invalid_inputs_yield_no_applications(self):
+        """Test invalid product inputs return an empty list"""
+        for test_name, product_info in INPUT_VALIDATION_CASES:
+            with self.subTest(case=test_name):
+                self.assertEqual(self.agent.find_and_extract_applications(product_info), [])
+    
+    def test_application_validation(self):
+        """Test application validity rules"""
+        for test_name, app, expected in APPLICATION_VALIDATION_CASES:
+            with self.subTest(case=test_name):
+                self.assertEqual(self.agent._validate_application(app), expected)
+
 def main():
     """Run all error handling tests"""
     print("🚀 ERROR HANDLING AND VALIDATION TESTS")
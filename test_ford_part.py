@@ -48,11 +48,12 @@ def test_ford_part_sourcing():
         if image_paths:
             print(f"\n✅ SUCCESS: Found {len(image_paths)} image(s)")
             for path in image_paths:
-                if os.path.exists(path):
-                    size = os.path.getsize(path) / 1024
-                    print(f"  📁 {path} ({size:.1f} KB)")
-                else:
+                try:
+                    size = os.stat(path).st_size / 1024
+                except FileNotFoundError:
                     print(f"  ❌ {path} (not found)")
+                else:
+                    print(f"  📁 {path} ({size:.1f} KB)")
         else:
             print(f"\n❌ No official images found")
             print("   This may be normal if the specific part has no official images")
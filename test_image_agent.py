@@ -125,11 +125,12 @@ def test_image_sourcing_with_real_parts():
             if image_paths:
                 print(f"✓ SUCCESS: Found {len(image_paths)} image(s)")
                 for path in image_paths:
-                    if os.path.exists(path):
-                        file_size = os.path.getsize(path) / 1024  # KB
-                        print(f"  - {path} ({file_size:.1f} KB)")
-                    else:
+                    try:
+                        file_size = os.stat(path).st_size / 1024  # KB
+                    except FileNotFoundError:
                         print(f"  - {path} (FILE NOT FOUND)")
+                    else:
+                        print(f"  - {path} ({file_size:.1f} KB)")
             else:
                 print("❌ No images found")
                 
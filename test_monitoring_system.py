@@ -6,34 +6,56 @@ Tests performance monitoring, structured logging, and dashboard functionality
 
 import unittest
 import tempfile
-import shutil
 import os
 import time
 import json
+import logging
+from contextlib import redirect_stdout
+from io import StringIO
 from unittest.mock import patch, MagicMock
 
 # Import monitoring components
 from monitoring.performance_monitor import (
     performance_monitor, OperationTimer, MetricPoint, 
-    PerformanceStats, monitor_operation
+    PerformanceStats, MetricsHistory, monitor_operation
 )
 from monitoring.logging_system import (
-    StructuredLogger, get_logger, LogContext, log_operation
+    StructuredLogger, BatchedRotatingFileHandler, get_logger, LogContext, log_operation
 )
 
+# Scratch directories go on tmpfs where the host has one
+_SCRATCH_ROOT = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+def _scratch_dir():
+    """Temporary directory for test output, removed by cleanup() or on exit of a with-block"""
+    return tempfile.TemporaryDirectory(prefix='dperf_', dir=_SCRATCH_ROOT,
+                                       ignore_cleanup_errors=True)
+
+class FakeClock:
+    """Manually advanced stand-in for time.perf_counter, so timed tests need not sleep"""
+    
+    def __init__(self, start: float = 0.0):
+        self.current = start
+    
+    def now(self) -> float:
+        return self.current
+    
+    def advance(self, seconds: float):
+        self.current += seconds
+
 class TestPerformanceMonitor(unittest.TestCase):
     """Test performance monitoring functionality"""
     
     def setUp(self):
         """Set up test environment"""
         # Clear performance monitor state
-        performance_monitor.metrics_history.clear()
-        performance_monitor.active_operations.clear()
+        performance_monitor.reset()
     
     def test_operation_timer_success(self):
         """Test successful operation timing"""
-        with OperationTimer('test_agent', 'test_operation') as timer:
-            time.sleep(0.1)  # Simulate work
+        clock = FakeClock()
+        with OperationTimer('test_agent', 'test_operation', time_source=clock.now) as timer:
+            clock.advance(0.1)  # Simulate work
             timer.set_metadata('test_key', 'test_value')
         
         # Check metrics were recorded
@@ -43,7 +65,7 @@ class TestPerformanceMonitor(unittest.TestCase):
         self.assertEqual(metric.agent, 'test_agent')
         self.assertEqual(metric.operation, 'test_operation')
         self.assertTrue(metric.success)
-        self.assertGreater(metric.duration, 0.05)  # Should be around 0.1 seconds
+        self.assertEqual(metric.duration, 0.1)
         self.assertEqual(metric.metadata['test_key'], 'test_value')
     
     def test_operation_timer_failure(self):
@@ -64,6 +86,25 @@ class TestPerformanceMonitor(unittest.TestCase):
         self.assertFalse(metric.success)
         self.assertIn('error', metric.metadata)
     
+    def test_recorded_metadata_is_a_snapshot(self):
+        """Test later changes to the caller's metadata don't rewrite recorded metrics"""
+        metadata = {'sku': 'TEST-1'}
+        with OperationTimer('test_agent', 'test_operation', metadata) as timer:
+            pass
+        timer.set_metadata('late_key', 'late_value')
+        
+        start = time.perf_counter()
+        performance_monitor.record_many('main', [
+            ('image_sourcing', start, start + 0.1, None),
+            ('translation', start + 0.1, start + 0.2, None)
+        ], metadata)
+        
+        timed, first, second = performance_monitor.metrics_history
+        self.assertEqual(timed.metadata, {'sku': 'TEST-1'})
+        self.assertIsNot(first.metadata, second.metadata)
+        first.metadata['step'] = 1
+        self.assertEqual(second.metadata, {'sku': 'TEST-1', 'late_key': 'late_value'})
+    
     def test_performance_stats_calculation(self):
         """Test performance statistics calculation"""
         # Add some test metrics
@@ -90,6 +131,113 @@ class TestPerformanceMonitor(unittest.TestCase):
         self.assertEqual(stat.min_duration, 0.1)
         self.assertGreater(stat.max_duration, 0.1)
     
+    def test_performance_stats_multi_window(self):
+        """Test multi-window statistics match per-window queries"""
+        now = time.time()
+        for age_hours, success in [(0.5, True), (3, False), (12, True), (100, True)]:
+            performance_monitor.metrics_history.append(MetricPoint(
+                timestamp=now - age_hours * 3600, agent='test_agent', operation='test_operation',
+                duration=0.1, success=success, metadata={}
+            ))
+        
+        stats_by_window = performance_monitor.get_performance_stats_multi(windows=[1, 6, 24, 168])
+        
+        totals = {hours: stats['test_agent_test_operation'].total_operations
+                  for hours, stats in stats_by_window.items()}
+        self.assertEqual(totals, {1: 1, 6: 2, 24: 3, 168: 4})
+        self.assertEqual(stats_by_window[6]['test_agent_test_operation'].success_rate, 0.5)
+        for hours in (1, 6, 24, 168):
+            self.assertEqual(stats_by_window[hours], performance_monitor.get_performance_stats(hours=hours))
+    
+    def test_reset_clears_history_and_rolling_windows(self):
+        """Test reset() leaves the monitor as if nothing had been recorded"""
+        performance_monitor.record_instant_metric('test_agent', 'translation', False, 0.1)
+        performance_monitor.start_operation('test_agent', 'translation')
+        
+        performance_monitor.reset()
+        
+        self.assertEqual(len(performance_monitor.metrics_history), 0)
+        self.assertEqual(performance_monitor.active_operations, {})
+        self.assertEqual(performance_monitor._recent_by_key, {})
+        self.assertEqual(performance_monitor.get_performance_stats(), {})
+    
+    def test_record_many_matches_per_metric_recording(self):
+        """Test record_many records the same history, rolling window and alerts as one call per metric"""
+        successes = [True, False, False, True, False, False, True, True, False, False, False, True]
+        durations = [1.0, 70.0, 2.0, 3.0, 65.0, 1.0, 1.0, 2.0, 3.0, 4.0, 80.0, 1.0]
+        
+        def record(use_batch):
+            performance_monitor.reset()
+            output = StringIO()
+            with redirect_stdout(output):
+                # 'image_sourcing' matches a threshold entry, so alerts are checked
+                performance_monitor.record_instant_metric('main', 'image_sourcing', True, 1.0)
+                if use_batch:
+                    start = time.perf_counter()
+                    performance_monitor.record_many('main', [
+                        ('image_sourcing', start, start + duration, None if success else 'failed')
+                        for success, duration in zip(successes, durations)
+                    ])
+                else:
+                    for success, duration in zip(successes, durations):
+                        performance_monitor.record_instant_metric('main', 'image_sourcing', success, duration)
+            history = [(metric.success, round(metric.duration, 6)) for metric in performance_monitor.metrics_history]
+            window = list(performance_monitor._recent_by_key[('main', 'image_sourcing')])
+            return history, window, output.getvalue()
+        
+        per_metric = record(use_batch=False)
+        self.assertIn('PERFORMANCE ALERT', per_metric[2])
+        self.assertEqual(record(use_batch=True), per_metric)
+    
+    def test_record_many(self):
+        """Test batched recording of inline perf_counter timings"""
+        start = time.perf_counter()
+        performance_monitor.record_many('main', [
+            ('image_sourcing', start, start + 0.5, None),
+            ('translation', start + 0.5, start + 0.75, 'Timeout')
+        ], {'sku': 'TEST-1'})
+        
+        self.assertEqual(len(performance_monitor.metrics_history), 2)
+        first, second = performance_monitor.metrics_history
+        self.assertEqual(first.operation, 'image_sourcing')
+        self.assertTrue(first.success)
+        self.assertAlmostEqual(first.duration, 0.5)
+        self.assertEqual(first.metadata, {'sku': 'TEST-1'})
+        self.assertFalse(second.success)
+        self.assertEqual(second.metadata['error'], 'Timeout')
+        self.assertAlmostEqual(second.timestamp - first.timestamp, 0.25, places=3)
+    
+    def test_metrics_history_ring_buffer(self):
+        """Test the columnar history keeps only the newest points in order"""
+        history = MetricsHistory(maxlen=3)
+        for i in range(5):
+            history.append(MetricPoint(
+                timestamp=float(i), agent='test_agent', operation=f'op{i % 2}',
+                duration=i / 10, success=i % 2 == 0, metadata={'iteration': i}
+            ))
+        
+        self.assertEqual(len(history), 3)
+        self.assertEqual([m.metadata['iteration'] for m in history], [2, 3, 4])
+        self.assertEqual(history[-1].operation, 'op0')
+        timestamp, duration, success, key_id = history.columns()
+        self.assertEqual(timestamp.tolist(), [2.0, 3.0, 4.0])
+        self.assertEqual(success.tolist(), [True, False, True])
+        self.assertEqual([history.key(k) for k in key_id],
+                         [('test_agent', 'op0'), ('test_agent', 'op1'), ('test_agent', 'op0')])
+    
+    def test_success_rate_alert_uses_last_ten_operations(self):
+        """Test success rate alerts are computed over the rolling window"""
+        with patch('builtins.print') as mock_print:
+            for success in [False] * 5 + [True] * 10:
+                performance_monitor.record_instant_metric('test_agent', 'translation', success, 0.1)
+        
+        alerts = [call.args[0] for call in mock_print.call_args_list]
+        self.assertEqual(len(alerts), 10)  # 5th..14th ops; the 15th sees ten successes
+        self.assertIn('Success rate 0.00%', alerts[0])
+        self.assertIn('Success rate 90.00%', alerts[-1])
+        recent_window = performance_monitor._recent_by_key[('test_agent', 'translation')]
+        self.assertEqual(list(recent_window), [True] * 10)
+    
     def test_recent_failures(self):
         """Test recent failures tracking"""
         # Add some successful and failed operations
@@ -108,6 +256,23 @@ class TestPerformanceMonitor(unittest.TestCase):
             self.assertFalse(failure.success)
             self.assertIn('error', failure.metadata)
     
+    def test_export_metrics_ndjson(self):
+        """Test metrics export writes a header line followed by one line per metric"""
+        performance_monitor.record_instant_metric('test_agent', 'op1', True, 0.1, {'sku': 'A'})
+        performance_monitor.record_instant_metric('test_agent', 'op2', False, 0.2, {'error': 'Test error'})
+        
+        with _scratch_dir() as temp_dir:
+            export_path = os.path.join(temp_dir, 'exports', 'metrics.jsonl')
+            performance_monitor.export_metrics(export_path, hours=1)
+            
+            with open(export_path) as f:
+                lines = [json.loads(line) for line in f]
+        
+        self.assertEqual(lines[0]['total_metrics'], 2)
+        self.assertEqual([line['operation'] for line in lines[1:]], ['op1', 'op2'])
+        self.assertEqual(lines[1]['metadata'], {'sku': 'A'})
+        self.assertFalse(lines[2]['success'])
+    
     def test_monitor_operation_decorator(self):
         """Test operation monitoring decorator"""
         @monitor_operation('test_agent', 'decorated_operation', {'source': 'decorator'})
@@ -140,28 +305,126 @@ class TestStructuredLogger(unittest.TestCase):
     
     def setUp(self):
         """Set up temporary log directory"""
-        self.temp_dir = tempfile.mkdtemp()
+        scratch = _scratch_dir()
+        self.addCleanup(scratch.cleanup)
+        self.temp_dir = scratch.name
         self.logger = StructuredLogger('test_logger', self.temp_dir)
-    
-    def tearDown(self):
-        """Clean up temporary files"""
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        self.addCleanup(self.logger.close)
     
     def test_basic_logging_levels(self):
         """Test all logging levels"""
-        self.logger.debug("Debug message")
-        self.logger.info("Info message")
-        self.logger.warning("Warning message")
-        self.logger.error("Error message")
-        self.logger.critical("Critical message")
-        self.logger.success("Success message")
-        self.logger.performance("Performance message", duration=1.5)
-        self.logger.business("Business message")
+        self.logger.debug("Debug message", step=1)
+        self.logger.info("Info message", step=2)
+        self.logger.warning("Warning message", step=3)
+        self.logger.error("Error message", step=4)
+        self.logger.critical("Critical message", step=5)
+        self.logger.success("Success message", step=6)
+        self.logger.performance("Performance message", duration=1.5, step=7)
+        self.logger.business("Business message", step=8)
         
         # Check log files were created
         log_files = os.listdir(self.temp_dir)
         self.assertTrue(any('test_logger.log' in f for f in log_files))
         self.assertTrue(any('test_logger_structured.jsonl' in f for f in log_files))
+        
+        # The structured log is append-only: exactly one JSON line per call, in order
+        self.logger.close()
+        with open(os.path.join(self.temp_dir, 'test_logger_structured.jsonl')) as f:
+            self.assertEqual([json.loads(line)['step'] for line in f], list(range(1, 9)))
+    
+    def test_batched_file_handler_flushes_per_batch(self):
+        """Test the JSONL handler flushes once per batch of records"""
+        path = os.path.join(self.temp_dir, 'batched.jsonl')
+        handler = BatchedRotatingFileHandler(path, batch_size=3, flush_interval=60)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        record = logging.LogRecord('batched', logging.INFO, __file__, 0, 'entry', None, None)
+        
+        try:
+            handler.handle(record)
+            handler.handle(record)
+            self.assertEqual(os.path.getsize(path), 0)
+            
+            handler.handle(record)
+            with open(path) as f:
+                self.assertEqual(f.read().splitlines(), ['entry'] * 3)
+        finally:
+            handler.close()
+    
+    def test_batched_file_handler_flushes_errors_immediately(self):
+        """Test an error record is flushed without waiting for the batch"""
+        path = os.path.join(self.temp_dir, 'errors.jsonl')
+        handler = BatchedRotatingFileHandler(path, batch_size=100, flush_interval=60)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        
+        try:
+            handler.handle(logging.LogRecord('errors', logging.INFO, __file__, 0, 'info', None, None))
+            self.assertEqual(os.path.getsize(path), 0)
+            
+            handler.handle(logging.LogRecord('errors', logging.ERROR, __file__, 0, 'error', None, None))
+            with open(path) as f:
+                self.assertEqual(f.read().splitlines(), ['info', 'error'])
+        finally:
+            handler.close()
+    
+    def test_batched_file_handler_rotates_by_tracked_size(self):
+        """Test the batched handler rotates once the tracked size reaches maxBytes"""
+        path = os.path.join(self.temp_dir, 'rotating.jsonl')
+        handler = BatchedRotatingFileHandler(path, maxBytes=20, backupCount=1, batch_size=100)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        record = logging.LogRecord('rotating', logging.INFO, __file__, 0, 'entry', None, None)
+        
+        try:
+            for _ in range(5):
+                handler.handle(record)
+        finally:
+            handler.close()
+        
+        with open(path) as f:
+            self.assertEqual(f.read(), 'entry\n' * 2)
+        with open(path + '.1') as f:
+            self.assertEqual(f.read(), 'entry\n' * 3)
+    
+    def test_structured_log_only_records_extra_data(self):
+        """Test records without structured fields are kept out of the JSONL file"""
+        self.logger.info("Plain message")
+        self.logger.info("Structured message", sku='ABC123')
+        
+        # Drain the background queue to the files
+        self.logger.close()
+        
+        with open(os.path.join(self.temp_dir, 'test_logger_structured.jsonl')) as f:
+            entries = [json.loads(line) for line in f]
+        with open(os.path.join(self.temp_dir, 'test_logger.log')) as f:
+            text_log = f.read()
+        
+        self.assertEqual([entry['message'] for entry in entries], ["Structured message"])
+        self.assertEqual(entries[0]['sku'], 'ABC123')
+        self.assertIn("Plain message", text_log)
+    
+    def test_idle_logger_flushes_buffered_records(self):
+        """Test records reach the files once the logger goes idle, without close() or a full batch"""
+        self.logger.info("Idle message", sku='IDLE1')
+        path = os.path.join(self.temp_dir, 'test_logger_structured.jsonl')
+        
+        deadline = time.monotonic() + 5
+        while os.path.getsize(path) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        with open(path) as f:
+            self.assertEqual([json.loads(line)['sku'] for line in f], ['IDLE1'])
+    
+    def test_structured_log_keeps_plain_warnings_and_errors(self):
+        """Test warnings and errors reach the JSONL file even without structured fields"""
+        self.logger.info("Plain info")
+        self.logger.warning("Plain warning")
+        self.logger.error("x")
+        self.logger.close()
+        
+        with open(os.path.join(self.temp_dir, 'test_logger_structured.jsonl')) as f:
+            entries = [json.loads(line) for line in f]
+        
+        self.assertEqual([(entry['level'], entry['message']) for entry in entries],
+                         [('WARNING', "Plain warning"), ('ERROR', "x")])
     
     def test_context_management(self):
         """Test logging context management"""
@@ -192,6 +455,18 @@ class TestStructuredLogger(unittest.TestCase):
         context = self.logger._get_context()
         self.assertEqual(len(context), 0)
     
+    def test_log_context_flushes_on_exception(self):
+        """Test records logged inside a failing LogContext are on disk once it exits"""
+        with self.assertRaises(RuntimeError):
+            with LogContext(self.logger, sku='FAIL_SKU'):
+                self.logger.info("Before failure")
+                raise RuntimeError("boom")
+        
+        with open(os.path.join(self.temp_dir, 'test_logger_structured.jsonl')) as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([entry['message'] for entry in entries], ["Before failure"])
+        self.assertEqual(entries[0]['sku'], 'FAIL_SKU')
+    
     def test_log_operation_decorator(self):
         """Test log operation decorator"""
         @log_operation('test_logger', 'decorated_function')
@@ -217,24 +492,23 @@ class TestIntegrationScenarios(unittest.TestCase):
     
     def setUp(self):
         """Set up test environment"""
-        self.temp_dir = tempfile.mkdtemp()
-        performance_monitor.metrics_history.clear()
-        performance_monitor.active_operations.clear()
-    
-    def tearDown(self):
-        """Clean up"""
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        scratch = _scratch_dir()
+        self.addCleanup(scratch.cleanup)
+        self.temp_dir = scratch.name
+        performance_monitor.reset()
     
     def test_full_pipeline_simulation(self):
         """Test complete pipeline simulation with monitoring"""
         logger = StructuredLogger('pipeline_test', self.temp_dir)
+        self.addCleanup(logger.close)
+        clock = FakeClock()
         
         def simulate_image_sourcing(sku):
             """Simulate image sourcing operation"""
             with LogContext(logger, operation='image_sourcing', sku=sku):
-                with OperationTimer('image_agent', 'image_search', {'sku': sku}):
+                with OperationTimer('image_agent', 'image_search', {'sku': sku}, time_source=clock.now):
                     logger.info(f"Starting image search for SKU: {sku}")
-                    time.sleep(0.05)  # Simulate work
+                    clock.advance(0.05)  # Simulate work
                     
                     # Simulate occasional failures
                     if sku == 'FAIL_SKU':
@@ -247,18 +521,20 @@ class TestIntegrationScenarios(unittest.TestCase):
         def simulate_vehicle_apps(sku):
             """Simulate vehicle application extraction"""
             with LogContext(logger, operation='vehicle_apps', sku=sku):
-                with OperationTimer('vehicle_agent', 'application_extraction', {'sku': sku}):
+                with OperationTimer('vehicle_agent', 'application_extraction', {'sku': sku},
+                                    time_source=clock.now):
                     logger.info(f"Extracting vehicle applications for SKU: {sku}")
-                    time.sleep(0.03)  # Simulate work
+                    clock.advance(0.03)  # Simulate work
                     logger.success(f"Found 3 applications for SKU: {sku}")
                     return ["2020-2023 Honda Civic", "2019-2022 Acura ILX", "2021-2023 Honda Accord"]
         
         def simulate_bigcommerce_upload(sku):
             """Simulate BigCommerce upload"""
             with LogContext(logger, operation='bigcommerce_upload', sku=sku):
-                with OperationTimer('bigcommerce_agent', 'product_upload', {'sku': sku}):
+                with OperationTimer('bigcommerce_agent', 'product_upload', {'sku': sku},
+                                    time_source=clock.now):
                     logger.info(f"Uploading product to BigCommerce: {sku}")
-                    time.sleep(0.02)  # Simulate work
+                    clock.advance(0.02)  # Simulate work
                     logger.success(f"Product uploaded successfully: {sku}")
                     return {"id": f"bc_{sku}", "status": "active"}
         
@@ -312,6 +588,10 @@ class TestIntegrationScenarios(unittest.TestCase):
                 if key in stats:
                     self.assertEqual(stats[key].failed_operations, 0)
         
+        # Durations come from the fake clock, not wall time
+        self.assertAlmostEqual(stats['image_agent_image_search'].average_duration, 0.05)
+        self.assertAlmostEqual(stats['bigcommerce_agent_product_upload'].max_duration, 0.02)
+        
         # Check log files were created
         log_files = os.listdir(self.temp_dir)
         self.assertTrue(any('pipeline_test.log' in f for f in log_files))
@@ -10,14 +10,15 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from agents.vehicle_application_agent import HawkPerformanceParser
 import requests
 
+# One parser for every test; the parsing helpers never touch the session
+PARSER = HawkPerformanceParser(requests.Session())
+
 def test_concatenated_parsing():
     """Test the new concatenated vehicle parsing functionality"""
     print("🧪 TESTING CONCATENATED VEHICLE PARSING FIX")
     print("=" * 60)
     
-    # Create parser instance
-    session = requests.Session()
-    parser = HawkPerformanceParser(session)
+    parser = PARSER
     
     # Test case from actual cache data - massive concatenated string
     concatenated_text = """2020 Acura ILX Base OE Incl.Shims2020 Acura ILX 2.4L OE Incl.Shims2019 Acura ILX Base 2.4L OE Incl.Shims2019 Acura ILX 2.4L OE Incl.Shims2018 Acura ILX Base 2.4L OE Incl.Shims2017 Acura ILX Base 2.4L OE Incl.Shims2016 Acura ILX Base 2.4L OE Incl.Shims2015 Honda CR-Z EX 1.5L2015 Honda CR-Z Base 1.5L2015 Honda Civic Si 2.4L"""
@@ -61,8 +62,7 @@ def test_single_vehicle_parsing():
     print("\n🧪 TESTING SINGLE VEHICLE PARSING")
     print("=" * 40)
     
-    session = requests.Session()
-    parser = HawkPerformanceParser(session)
+    parser = PARSER
     
     test_cases = [
         "2020 Acura ILX Base 2.4L OE Incl.Shims",
@@ -85,8 +85,7 @@ def test_fallback_parsing():
     print("\n🧪 TESTING FALLBACK PARSING")
     print("=" * 30)
     
-    session = requests.Session()
-    parser = HawkPerformanceParser(session)
+    parser = PARSER
     
     # Problematic text that might not split well
     problematic_text = "Various applications include 2019 Honda Civic and 2020 Toyota Corolla plus 2021 Ford Focus models"
@@ -242,7 +242,7 @@ class TestEnhancedVehicleAgent(unittest.TestCase):
         """Test concatenated text parsing like the Hawk Performance issue"""
         concatenated_text = "2016-2018 Honda Civic Si 2019-2021 Acura ILX 2020-2022 Toyota Corolla GR 2017-2019 Ford Focus RS"
         
-        applications = self.agent._parse_concatenated_vehicle_text(concatenated_text, None)
+        applications = self.agent._parse_concatenated_vehicle_text(concatenated_text)
         
         self.assertGreater(len(applications), 2)  # Should find multiple vehicles
         
@@ -260,6 +260,19 @@ class TestEnhancedVehicleAgent(unittest.TestCase):
         self.assertIn('Corolla', models)
         self.assertIn('Focus', models)
     
+    def test_mixed_format_concatenated_text(self):
+        """Test single years, ranges and numeric models in one concatenated string"""
+        mixed_text = "2018 BMW 3 Series 2019-2021 Audi A4 2020 Mercedes C-Class 2010-2020 Ford F-150"
+        
+        applications = self.agent._parse_concatenated_vehicle_text(mixed_text)
+        
+        self.assertEqual(len(applications), 4)
+        self.assertEqual([app.make for app in applications], ['BMW', 'Audi', 'Mercedes-Benz', 'Ford'])
+        self.assertEqual(applications[0].model, '3')
+        self.assertEqual(applications[0].year_end, 2018)
+        self.assertEqual((applications[1].year_start, applications[1].year_end), (2019, 2021))
+        self.assertEqual(applications[3].model, 'F-150')
+    
     def test_duplicate_removal(self):
         """Test duplicate application removal"""
         # Create applications with duplicates
@@ -8,7 +8,7 @@ from io import StringIO
 import sys
 
 # Import the functions and classes from your existing project
-from main import process_single_product, load_source_products
+from main import process_single_product, load_source_products, EXCEL_READ_ENGINE
 from agents.image_agent import ImageSourcingAgent
 from agents.bigcommerce_agent import BigCommerceUploaderAgent
 from agents.vehicle_application_agent import VehicleApplicationAgent
@@ -157,12 +157,13 @@ if st.session_state.processing:
                 'bigcommerce': BigCommerceUploaderAgent(STORE_HASH, ACCESS_TOKEN),
                 'vehicle_app': VehicleApplicationAgent(),
                 'translate': translate_client, 'gemini': gemini_model,
-                'existing_skus': set(), 'existing_descs': {}
+                'existing_skus': set(), 'existing_descs': {},
+                'translations': {}  # This run's translations, so repeated names are sent once
             }
             print("✅ All API clients and agents initialized.")
 
             # --- Load data from uploaded files ---
-            all_source_products = pd.read_excel(st.session_state.source_file).to_dict('records')
+            all_source_products = pd.read_excel(st.session_state.source_file, engine=EXCEL_READ_ENGINE).to_dict('records')
             df_skus = pd.read_csv(st.session_state.skus_file)
             agents['existing_skus'] = set(df_skus.iloc[:, 0].dropna().astype(str))
             